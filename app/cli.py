@@ -0,0 +1,258 @@
+# app/cli.py
+"""
+Proses batch tanpa UI:
+
+    python -m app.cli "data/*.xlsx" --out hasil/ --workers 4
+    python -m app.cli data/ --config config.json --interval 15 --sabtu
+    python -m app.cli "his/*.csv" --format parquet
+    python -m app.cli jaringan.xlsx --chunk-doctors 2000
+
+Tiap file (.xlsx, .csv, .parquet): validasi -> DataCleaner/Scheduler ->
+ExcelWriter (atau TableWriter untuk --format csv/parquet), dijalankan
+di ProcessPoolExecutor. Tidak mengimpor Streamlit/Plotly.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields
+
+from app.config import Config
+from app.core.excel_writer import ExcelWriter
+from app.core.readers import BACKENDS
+from app.core.scheduler import Scheduler
+from app.core.table_writer import TableWriter, TABLE_FORMATS
+from app.core.validator import Validator
+from app.core.workbook import ParsedWorkbook
+
+
+OUTPUT_SUFFIX = "_hasil.xlsx"
+INPUT_EXTENSIONS = (".xlsx", ".csv", ".parquet")
+
+
+def find_inputs(patterns):
+    """Direktori -> semua .xlsx/.csv/.parquet di dalamnya; selain itu diperlakukan sebagai glob."""
+    found = []
+    for p in patterns:
+        if os.path.isdir(p):
+            found += sorted(f for ext in INPUT_EXTENSIONS
+                            for f in glob.glob(os.path.join(p, "*" + ext)))
+        else:
+            found += sorted(glob.glob(p))
+
+    out = []
+    for f in dict.fromkeys(os.path.abspath(f) for f in found):
+        name = os.path.basename(f)
+        # lewati file lock Excel & hasil run sebelumnya
+        if name.startswith("~$") or name.endswith(OUTPUT_SUFFIX):
+            continue
+        out.append(f)
+    return out
+
+
+def output_path(path, out_dir=None, fmt="xlsx"):
+    """csv / parquet -> zip berisi satu file per tabel (mis. data_hasil_csv.zip)."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    suffix = OUTPUT_SUFFIX if fmt == "xlsx" else f"_hasil_{fmt}.zip"
+    return os.path.join(out_dir or os.path.dirname(path), stem + suffix)
+
+
+def load_config(path=None, **overrides):
+    """Config default <- file JSON (nama field Config) <- flag CLI."""
+    values = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            values.update(json.load(f))
+
+    known = {f.name for f in fields(Config)}
+    unknown = sorted(set(values) - known)
+    if unknown:
+        raise ValueError(f"Field config tidak dikenal: {unknown}")
+
+    values.update({k: v for k, v in overrides.items() if v is not None})
+    return Config(**values)
+
+
+def process_file(path, out, config_values):
+    """Jalankan satu workbook (dipanggil di worker process)."""
+    config = Config(**config_values)
+    res = {"file": path, "output": out, "ok": False, "rows": 0}
+    t0 = time.perf_counter()
+    try:
+        parsed = ParsedWorkbook.from_upload(path, config.reader)
+        ok, err = Validator.validate_fast(parsed, config.max_upload_mb * 1024 * 1024, config.max_rows)
+        if not ok:
+            res["error"] = err
+            return res
+
+        df_reg = parsed.sheet_or_empty("Reguler")
+        df_pol = parsed.sheet_or_empty("Poleks")
+        t1 = time.perf_counter()
+
+        scheduler = Scheduler(config)
+        if config.chunk_doctors and config.export_format == "xlsx":
+            # proses & tulis berjalan selang-seling -> dilaporkan sebagai TULIS
+            rows = process_chunked(parsed, scheduler, df_reg, df_pol, out)
+            if not rows:
+                res["error"] = "Hasil proses kosong"
+                return res
+            res.update(ok=True, rows=rows, read=t1 - t0, process=0.0,
+                       write=time.perf_counter() - t1, fixed=sum(scheduler.fix_report.values()))
+            return res
+
+        df_all = scheduler.process_sheets(df_reg, df_pol)
+        t2 = time.perf_counter()
+        if df_all.empty:
+            res["error"] = "Hasil proses kosong"
+            return res
+
+        if config.export_format in TABLE_FORMATS:
+            buf = TableWriter(config).write(df_all, scheduler.slot_labels(), config.export_format)
+        else:
+            buf = ExcelWriter(config).write(parsed, df_all, scheduler.slot_labels())
+        with open(out, "wb") as f:
+            f.write(buf.getvalue())
+        t3 = time.perf_counter()
+
+        res.update(ok=True, rows=len(df_all), read=t1 - t0, process=t2 - t1,
+                   write=t3 - t2, fixed=sum(scheduler.fix_report.values()))
+    except Exception as e:
+        res["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        res["total"] = time.perf_counter() - t0
+    return res
+
+
+def process_chunked(parsed, scheduler, df_reg, df_pol, out):
+    """Mode chunk: potongan jadwal langsung ke ExcelWriter.write_chunked. Hasil: jumlah baris."""
+    rows = []
+
+    def tally(chunks):
+        for mat in chunks:
+            rows.append(len(mat))
+            yield mat
+
+    chunks = tally(scheduler.iter_chunks(df_reg, df_pol, scheduler.config.chunk_doctors))
+    ExcelWriter(scheduler.config).write_chunked(parsed, chunks, scheduler.slot_labels(), out)
+    if not rows:
+        os.remove(out)
+    return sum(rows)
+
+
+def run(paths, config, out_dir=None, workers=None):
+    """Proses semua file; hasil dikembalikan urut sesuai input."""
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    values = asdict(config)
+    jobs = [(p, output_path(p, out_dir, config.export_format)) for p in paths]
+    if workers == 1 or len(jobs) <= 1:
+        results = [process_file(p, o, values) for p, o in jobs]
+        for res in results:
+            print_result(res)
+        return results
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_file, p, o, values): p for p, o in jobs}
+        for fut in as_completed(futures):
+            res = fut.result()
+            results[futures[fut]] = res
+            print_result(res)
+    return [results[p] for p, _ in jobs]
+
+
+def print_result(res, stream=sys.stderr):
+    name = os.path.basename(res["file"])
+    if res["ok"]:
+        print(f"  selesai  {name} ({res['total']:.2f}s)", file=stream)
+    else:
+        print(f"  GAGAL    {name}: {res.get('error')}", file=stream)
+
+
+def print_summary(results, wall, stream=sys.stdout):
+    width = max([len(os.path.basename(r["file"])) for r in results] + [4])
+    print(f"{'FILE':<{width}}  {'BARIS':>7}  {'BACA':>7}  {'PROSES':>7}  "
+          f"{'TULIS':>7}  {'TOTAL':>7}  {'BARIS/S':>9}", file=stream)
+    for r in results:
+        name = os.path.basename(r["file"])
+        if not r["ok"]:
+            print(f"{name:<{width}}  GAGAL: {r.get('error')}", file=stream)
+            continue
+        rate = r["rows"] / r["total"] if r["total"] else 0.0
+        print(f"{name:<{width}}  {r['rows']:>7}  {r['read']:>6.2f}s  {r['process']:>6.2f}s  "
+              f"{r['write']:>6.2f}s  {r['total']:>6.2f}s  {rate:>9.0f}", file=stream)
+
+    ok = [r for r in results if r["ok"]]
+    rows = sum(r["rows"] for r in ok)
+    print(f"\n{len(ok)}/{len(results)} file berhasil, {rows} baris, "
+          f"{wall:.2f}s wall ({rows / wall if wall else 0:.0f} baris/s)", file=stream)
+
+
+def hhmm(value):
+    """Argumen HH:MM -> (jam, menit); format salah = error argparse, bukan traceback."""
+    try:
+        h, m = (int(x) for x in value.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"format jam harus HH:MM: {value!r}")
+    if not (0 <= h < 24 and 0 <= m < 60):
+        raise argparse.ArgumentTypeError(f"jam di luar rentang 00:00-23:59: {value!r}")
+    return h, m
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m app.cli",
+                                 description="Proses batch workbook jadwal poli tanpa UI.")
+    ap.add_argument("inputs", nargs="+", help="direktori atau glob file .xlsx / .csv / .parquet")
+    ap.add_argument("-o", "--out", help="direktori output (default: di samping file input)")
+    ap.add_argument("-c", "--config", help="file JSON berisi field Config")
+    ap.add_argument("-w", "--workers", type=int, default=None,
+                    help="jumlah worker process (default: jumlah CPU)")
+    ap.add_argument("--start", type=hhmm, help="jam mulai slot, HH:MM")
+    ap.add_argument("--interval", type=int, dest="interval_minutes")
+    ap.add_argument("--max-poleks", type=int, dest="max_poleks_per_slot")
+    ap.add_argument("--sabtu", action="store_true", default=None, dest="enable_sabtu")
+    ap.add_argument("--no-auto-fix", action="store_false", default=None, dest="auto_fix_errors")
+    ap.add_argument("--streaming", action="store_true", default=None, dest="streaming_export")
+    ap.add_argument("--style-mode", choices=["cell", "rules"])
+    ap.add_argument("--reader", choices=list(BACKENDS), help="backend pembaca sheet input")
+    ap.add_argument("--chunk-doctors", type=int, dest="chunk_doctors",
+                    help="proses & tulis per N dokter (memori tetap, hanya xlsx; "
+                         "baris Jadwal & Rekap Layanan urut per potongan)")
+    ap.add_argument("--format", choices=["xlsx"] + list(TABLE_FORMATS), dest="export_format",
+                    help="format hasil (csv/parquet: zip satu file per tabel)")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    overrides = {k: getattr(args, k) for k in ("interval_minutes", "max_poleks_per_slot",
+                                                 "enable_sabtu", "auto_fix_errors",
+                                                 "streaming_export", "style_mode", "reader",
+                                                 "export_format", "chunk_doctors")}
+    if args.start:
+        overrides.update(start_hour=args.start[0], start_minute=args.start[1])
+
+    try:
+        config = load_config(args.config, **overrides)
+    except (OSError, ValueError) as e:
+        print(f"Config tidak valid: {e}", file=sys.stderr)
+        return 2
+
+    paths = find_inputs(args.inputs)
+    if not paths:
+        print("Tidak ada file .xlsx / .csv / .parquet yang cocok.", file=sys.stderr)
+        return 2
+
+    t0 = time.perf_counter()
+    results = run(paths, config, args.out, args.workers)
+    print_summary(results, time.perf_counter() - t0)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
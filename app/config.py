@@ -1,7 +1,20 @@
+import os
 from dataclasses import dataclass, field
 from datetime import time
 
 
+# dinaikkan bila format hasil proses/ekspor berubah (ikut kunci cache disk)
+APP_VERSION = "1.2.0"
+
+# field yang mempengaruhi hasil tiap tahap (dipakai sebagai kunci cache)
+# interval hasil clean + parse + merge tidak bergantung grid slot
+GRID_FIELDS = ("start_hour", "start_minute", "interval_minutes")
+INTERVAL_FIELDS = ("auto_fix_errors", "enable_sabtu", "hari_order")
+PROCESS_FIELDS = GRID_FIELDS + INTERVAL_FIELDS
+EXPORT_FIELDS = ("max_poleks_per_slot", "streaming_export", "export_copy_source",
+                 "width_mode", "width_sample_rows", "width_fixed", "style_mode")
+
+
 @dataclass
 class Config:
     start_hour: int = 7
@@ -11,6 +24,47 @@ class Config:
     auto_fix_errors: bool = True
     enable_sabtu: bool = False
 
+    # batas upload (dicek validator mode cepat sebelum parsing)
+    max_upload_mb: int = 25
+    max_rows: int = 50000
+
+    # pembaca sheet input: "auto" (calamine bila terpasang, lalu openpyxl
+    # read-only streaming) | "calamine" | "openpyxl" | "pandas" (workbook penuh)
+    reader: str = "auto"
+
+    # format hasil CLI: "xlsx" (ExcelWriter) | "csv" | "parquet" (zip satu file
+    # per tabel, tanpa openpyxl; parquet butuh pyarrow / fastparquet)
+    export_format: str = "xlsx"
+
+    # ekspor: write_only streaming (hemat memori) & salin sheet input
+    streaming_export: bool = False
+    export_copy_source: bool = True
+
+    # mode chunk (CLI, ekspor xlsx): dokter diproses & ditulis per N orang,
+    # memori kerja tetap berapa pun besar roster; 0 = mati (satu matriks penuh).
+    # Baris Jadwal & Rekap Layanan lalu urut per potongan, bukan urutan global
+    chunk_doctors: int = 0
+
+    # lebar kolom sheet hasil: "auto" | "sample" (N baris pertama) | "fixed"
+    width_mode: str = "auto"
+    width_sample_rows: int = 1000
+    width_fixed: int = 12
+
+    # pewarnaan slot: "cell" (fill per sel) | "rules" (conditional formatting + named style)
+    style_mode: str = "cell"
+
+    # paralel (process pool): partisi jadwal, agregat & tabel rekap; 1 = serial
+    workers: int = 1
+
+    # profiling per tahap (log JSON + tab Performa); memori via tracemalloc
+    profiling: bool = False
+    profiling_memory: bool = False
+
+    # cache hasil di disk (jadwal .npz + xlsx), LRU dibatasi total ukuran
+    result_cache: bool = True
+    result_cache_dir: str = os.path.join(os.path.expanduser("~"), ".cache", "jadwal-poli")
+    result_cache_mb: int = 200
+
     hari_order: dict = field(default_factory=lambda: {
         "Senin": 1,
         "Selasa": 2,
@@ -28,3 +82,7 @@ class Config:
 
     def time_slot_end(self):
         return time(14, 30)
+
+    def fingerprint(self, fields):
+        """Tuple (nama, repr nilai) — hashable & stabil untuk kunci cache."""
+        return tuple((f, repr(getattr(self, f))) for f in fields)
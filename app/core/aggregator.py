@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .grouping import group_codes, group_reduce, runs
+from .conflicts import ConflictIndex
+from .schedule_matrix import as_matrix, EMPTY, REG, POLEKS
+from app.utils.parallel import run_calls
+
+
+@dataclass
+class RecapAggregates:
+    """Hasil agregasi sekali jalan; sheet rekap tinggal memformat tabel ini."""
+    slot_str: list
+    interval: int
+    layanan: pd.DataFrame       # POLI, HARI, DOKTER, JENIS, START, END (menit)
+    poli_hours: pd.DataFrame    # POLI, HARI, REG, POLEKS (jam)
+    dokter_shifts: pd.DataFrame  # DOKTER, HARI, START, END (menit)
+    peak_counts: pd.DataFrame   # index HARI × kolom slot, jumlah baris aktif
+    conflicts: pd.DataFrame     # DOKTER, HARI, SLOT, POLI_CLASH, RE_CLASH
+    conflict_index: ConflictIndex
+
+
+class RunningRecap:
+    """
+    Agregat berjalan mode chunk (ExcelWriter.write_chunked): tabel yang dijumlah
+    lintas potongan dilipat tiap potongan, ukurannya tetap (poli × hari,
+    hari × slot) berapa pun jumlah dokter. Tabel per dokter tidak disimpan.
+    """
+
+    def __init__(self):
+        self.poli_hours = None
+        self.peak_counts = None
+
+    def add(self, agg):
+        ph = agg.poli_hours
+        if self.poli_hours is not None:
+            ph = pd.concat([self.poli_hours, ph], ignore_index=True)
+        self.poli_hours = ph.groupby(["POLI", "HARI"], sort=False, as_index=False)[
+            ["REG", "POLEKS"]].sum()
+
+        pc = agg.peak_counts
+        if self.peak_counts is not None:
+            pc = self.peak_counts.add(pc, fill_value=0).astype(np.int64)
+        self.peak_counts = pc
+
+    def finish(self):
+        """Urutan akhir sama dengan build(): kunci urut nilai (poli, hari)."""
+        if self.poli_hours is not None:
+            self.poli_hours = self.poli_hours.sort_values(["POLI", "HARI"], kind="stable",
+                                                          ignore_index=True)
+            self.peak_counts = self.peak_counts.sort_index()
+        return self
+
+
+class RecapAggregator:
+
+    def __init__(self, config):
+        self.config = config
+
+    def slot_minutes(self, slot_str):
+        return np.array([int(s[:2]) * 60 + int(s[3:]) for s in slot_str], dtype=np.int32)
+
+    # ======================================================================
+    # Tensor entitas (poli, hari, dokter) × slot
+    # ======================================================================
+    def build(self, df, slot_str):
+        interval = self.config.interval_minutes
+        minutes = self.slot_minutes(slot_str)
+
+        mat = as_matrix(df, slot_str, interval)
+        meta = mat.meta_frame()
+        ent_keys, r_ent, e_ent = self._entities(mat, meta)
+
+        # tabel-tabel di bawah saling independen -> process pool bila workers > 1
+        layanan, poli_hours, dokter_shifts, peak_counts, conflict_index = run_calls([
+            (self._layanan, (ent_keys, r_ent, e_ent, minutes, interval)),
+            (self._poli_hours, (ent_keys, r_ent, e_ent, interval)),
+            (self._dokter_shifts, (ent_keys, r_ent | e_ent, minutes, interval)),
+            (self._peak_counts, (meta, mat.slots != EMPTY, slot_str)),
+            (ConflictIndex.build, (mat, slot_str)),
+        ], self.config.workers)
+
+        return RecapAggregates(slot_str, interval, layanan, poli_hours, dokter_shifts,
+                               peak_counts, conflict_index.cells(), conflict_index)
+
+    # ======================================================================
+    # Tambal agregat setelah edit sebagian (IncrementalScheduler)
+    # ======================================================================
+    def update(self, agg, mat, removed, added, doctors, polis):
+        """
+        Agregat untuk `mat` (jadwal setelah edit) tanpa build ulang penuh.
+        Tabel per dokter (layanan, shift, konflik) dihitung ulang hanya dari
+        baris dokter di `doctors`, jam poli hanya untuk `polis`, peak =
+        peak lama - baris `removed` + baris `added`.
+        """
+        slot_str, interval = agg.slot_str, agg.interval
+        minutes = self.slot_minutes(slot_str)
+
+        sub = mat.take(mat.isin("DOKTER", doctors))
+        ent_keys, r_ent, e_ent = self._entities(sub)
+        conflict_index = ConflictIndex.build(sub, slot_str)
+        layanan = _replace(agg.layanan, "DOKTER", doctors,
+                           self._layanan(ent_keys, r_ent, e_ent, minutes, interval),
+                           ["POLI", "HARI", "DOKTER"])
+        dokter_shifts = _replace(agg.dokter_shifts, "DOKTER", doctors,
+                                 self._dokter_shifts(ent_keys, r_ent | e_ent, minutes, interval),
+                                 ["DOKTER", "HARI"])
+        conflicts = _replace(agg.conflicts, "DOKTER", doctors, conflict_index.cells(),
+                             ["DOKTER", "HARI"])
+
+        # jam poli = jumlah seluruh dokter di poli tsb -> ambil semua baris poli
+        sub = mat.take(mat.isin("POLI ASAL", polis))
+        ent_keys, r_ent, e_ent = self._entities(sub)
+        poli_hours = _replace(agg.poli_hours, "POLI", polis,
+                              self._poli_hours(ent_keys, r_ent, e_ent, interval),
+                              ["POLI", "HARI"])
+
+        peak = agg.peak_counts
+        for part, sign in ((added, 1), (removed, -1)):
+            delta = self._peak_counts(part.meta_frame(), part.slots != EMPTY, slot_str)
+            peak = peak.add(delta * sign, fill_value=0)
+        present = sorted(pd.unique(mat.column("HARI")))
+        peak = peak.reindex(present, fill_value=0).astype(np.int32)
+
+        return RecapAggregates(slot_str, interval, layanan, poli_hours, dokter_shifts, peak,
+                               conflicts, agg.conflict_index.patch(doctors, conflict_index))
+
+    def _entities(self, mat, meta=None):
+        # entitas = semua baris (Reguler & Poleks) milik satu dokter di satu poli & hari
+        if meta is None:
+            meta = mat.meta_frame()
+        ent_keys, ent = group_codes(meta, ["POLI ASAL", "HARI", "DOKTER"])
+        r_ent = group_reduce(ent, mat.mask(REG), len(ent_keys), np.logical_or)
+        e_ent = group_reduce(ent, mat.mask(POLEKS), len(ent_keys), np.logical_or)
+        return ent_keys, r_ent, e_ent
+
+    def _poli_hours(self, ent_keys, r_ent, e_ent, interval):
+        # jam per poli/hari: jumlah seluruh dokter (bukan hanya baris pertama)
+        poli_keys, poli = group_codes(ent_keys, ["POLI ASAL", "HARI"])
+        hours = interval / 60
+        reg = group_reduce(poli, r_ent.sum(axis=1), len(poli_keys), np.add) * hours
+        pol = group_reduce(poli, e_ent.sum(axis=1), len(poli_keys), np.add) * hours
+        return pd.DataFrame({
+            "POLI": poli_keys["POLI ASAL"].to_numpy(),
+            "HARI": poli_keys["HARI"].to_numpy(),
+            "REG": reg,
+            "POLEKS": pol,
+        })
+
+    def _dokter_shifts(self, ent_keys, active_ent, minutes, interval):
+        # shift dokter per hari = gabungan semua poli & jenis
+        dok_keys, dok = group_codes(ent_keys, ["DOKTER", "HARI"])
+        active = group_reduce(dok, active_ent, len(dok_keys), np.logical_or)
+        row, a, b = runs(active)
+        return pd.DataFrame({
+            "DOKTER": dok_keys["DOKTER"].to_numpy()[row],
+            "HARI": dok_keys["HARI"].to_numpy()[row],
+            "START": minutes[a],
+            "END": minutes[b - 1] + interval,
+        })
+
+    def _peak_counts(self, meta, active, slot_str):
+        # peak: jumlah baris jadwal aktif per hari × slot
+        hari_keys, hari = group_codes(meta, ["HARI"])
+        counts = group_reduce(hari, active.astype(np.int32), len(hari_keys), np.add)
+        return pd.DataFrame(counts, index=hari_keys["HARI"].to_numpy(), columns=slot_str)
+
+    def _layanan(self, ent_keys, r_ent, e_ent, minutes, interval):
+        parts = []
+        for jenis, mask, order in (("Reguler", r_ent, 0), ("Poleks", e_ent, 1)):
+            row, a, b = runs(mask)
+            parts.append(pd.DataFrame({
+                "ENT": row, "ORDER": order, "JENIS": jenis,
+                "START": minutes[a], "END": minutes[b - 1] + interval,
+            }))
+
+        # urut seperti groupby lama: entitas, lalu Reguler sebelum Poleks
+        out = pd.concat(parts, ignore_index=True)
+        out = out.sort_values(["ENT", "ORDER", "START"], kind="stable")
+        ent = out["ENT"].to_numpy()
+        return pd.DataFrame({
+            "POLI": ent_keys["POLI ASAL"].to_numpy()[ent],
+            "HARI": ent_keys["HARI"].to_numpy()[ent],
+            "DOKTER": ent_keys["DOKTER"].to_numpy()[ent],
+            "JENIS": out["JENIS"].to_numpy(),
+            "START": out["START"].to_numpy(),
+            "END": out["END"].to_numpy(),
+        })
+
+
+def _replace(old, col, values, new, keys):
+    """Ganti baris `old` dengan `col` di `values` oleh `new`, urut ulang seperti groupby."""
+    keep = ~old[col].isin(values).to_numpy()
+    out = pd.concat([old[keep], new], ignore_index=True)
+    return out.sort_values(keys, kind="stable", ignore_index=True)
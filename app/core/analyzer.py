@@ -1,6 +1,29 @@
+import numpy as np
 import pandas as pd
 import re
 
+from .grouping import ngroup
+from .readers import SOURCE_ROW
+
+
+# sel hari: minimal satu range "HH:MM-HH:MM" (titik / titik dua)
+TIME_RE = re.compile(r"\d{1,2}[:\.]\d{2}\s*-\s*\d{1,2}[:\.]\d{2}")
+# format baku: satu / beberapa range dipisah "/", ",", ";" atau "&"
+CELL_RE = re.compile(r"\s*{0}(\s*[/,;&]\s*{0})*\s*".format(TIME_RE.pattern))
+RANGE_RE = re.compile(r"(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})")
+
+# jenis masalah (kolom MASALAH tabel diagnostik)
+MISSING_COLUMN = "Kolom wajib tidak ada"
+INVALID_FORMAT = "Format waktu tidak valid"
+NONSTANDARD_FORMAT = "Format waktu tidak baku"
+INVALID_TIME = "Jam/menit di luar batas"
+END_BEFORE_START = "Jam selesai sebelum jam mulai"
+OUTSIDE_WINDOW = "Di luar jam slot"
+OVERLAP = "Range tumpang tindih"
+DUPLICATE_ROW = "Baris dokter-poli duplikat"
+
+ISSUE_COLUMNS = ["SHEET", "BARIS", "KOLOM", "NILAI", "MASALAH"]
+
 
 class ErrorAnalyzer:
 
@@ -19,13 +42,8 @@ class ErrorAnalyzer:
             report["is_valid"] = False
             report["errors"].append(f"Missing columns: {miss}")
 
-        pattern = re.compile(r"\d{1,2}[:\.]\d{2}\s*-\s*\d{1,2}[:\.]\d{2}")
-        bad = 0
-        for h in hari_list:
-            if h in df.columns:
-                for v in df[h].dropna().astype(str):
-                    if not pattern.search(v):
-                        bad += 1
+        _, _, raw = self._cells(df, hari_list)
+        bad = int((~raw.str.contains(TIME_RE)).sum())
 
         if bad:
             report["warnings"].append(f"{bad} invalid time format")
@@ -39,3 +57,114 @@ class ErrorAnalyzer:
         if r["warnings"]:
             out += "Warnings:\n" + "\n".join(r["warnings"]) + "\n"
         return out
+
+    # ======================================================================
+    # Diagnostik per sel (vektor) -> tabel SHEET, BARIS, KOLOM, NILAI, MASALAH
+    # ======================================================================
+    @staticmethod
+    def slot_window(config):
+        """(menit awal slot pertama, menit akhir slot terakhir) sesuai grid Scheduler."""
+        start = config.start_hour * 60 + config.start_minute
+        end = config.time_slot_end()
+        end = end.hour * 60 + end.minute
+        last = start + max(end - start, 0) // config.interval_minutes * config.interval_minutes
+        return start, last + config.interval_minutes
+
+    def issues(self, df, hari_list, sheet="", window=None):
+        """
+        Semua masalah sel sekaligus. BARIS = nomor baris asli di file (header = 1),
+        diambil dari index reader; frame lain dianggap mulai di baris 2.
+        window: (awal, akhir) menit; range di luar window ditandai.
+        """
+        line = self._source_rows(df)
+        parts = []
+        required = ["Nama Dokter", "Poli Asal", "Jenis Poli"]
+        miss = [c for c in required if c not in df.columns]
+        if miss:
+            parts.append(pd.DataFrame({"BARIS": 1, "KOLOM": miss, "NILAI": "",
+                                       "MASALAH": MISSING_COLUMN}))
+
+        rows, cols, raw = self._cells(df, hari_list)
+        hari = np.asarray([h for h in hari_list if h in df.columns], dtype=object)
+
+        def cell_issue(mask, text):
+            return pd.DataFrame({"BARIS": line[rows[mask]], "KOLOM": hari[cols[mask]],
+                                 "NILAI": raw.to_numpy()[mask], "MASALAH": text})
+
+        has_range = raw.str.contains(TIME_RE).to_numpy()
+        standard = raw.str.fullmatch(CELL_RE).to_numpy()
+        parts += [cell_issue(~has_range, INVALID_FORMAT),
+                  cell_issue(has_range & ~standard, NONSTANDARD_FORMAT)]
+
+        # semua range di semua sel (satu baris per range)
+        norm = raw.str.replace(" ", "", regex=False).str.replace(".", ":", regex=False)
+        found = norm.str.extractall(RANGE_RE)
+        if not found.empty:
+            cell = found.index.get_level_values(0).to_numpy()
+            sh, sm, eh, em = (found[i].astype(int).to_numpy() for i in range(4))
+            start, end = sh * 60 + sm, eh * 60 + em
+            bounds = (sh < 24) & (sm < 60) & (eh < 24) & (em < 60)
+            ok = bounds & (end > start)
+            outside = np.zeros_like(ok)
+            if window is not None:
+                outside = ok & ((start < window[0]) | (end > window[1]))
+            overlap = self._overlaps(df, rows[cell], cols[cell], start, end, ok)
+
+            for mask, text in ((~bounds, INVALID_TIME), (bounds & (end <= start), END_BEFORE_START),
+                               (outside, OUTSIDE_WINDOW), (overlap, OVERLAP)):
+                # satu laporan per sel walau sel berisi beberapa range bermasalah
+                parts.append(cell_issue(np.unique(cell[mask]), text))
+
+        if not miss:
+            keys = df[["Nama Dokter", "Poli Asal"]]
+            dup = np.flatnonzero(keys.duplicated().to_numpy() & keys.notna().all(axis=1).to_numpy())
+            parts.append(pd.DataFrame({
+                "BARIS": line[dup], "KOLOM": "Nama Dokter",
+                "NILAI": (keys["Nama Dokter"].astype(str) + " / " +
+                          keys["Poli Asal"].astype(str)).to_numpy()[dup],
+                "MASALAH": DUPLICATE_ROW}))
+
+        out = pd.concat([p for p in parts if len(p)] or [pd.DataFrame(columns=ISSUE_COLUMNS[1:])],
+                        ignore_index=True)
+        out.insert(0, "SHEET", sheet)
+        return out.sort_values("BARIS", kind="stable", ignore_index=True)[ISSUE_COLUMNS]
+
+    def summary(self, issues):
+        """Jumlah masalah per sheet & jenis."""
+        return issues.groupby(["SHEET", "MASALAH"], sort=False).size().rename("JUMLAH").reset_index()
+
+    @staticmethod
+    def _source_rows(df):
+        """Nomor baris file per posisi baris frame."""
+        if df.index.name == SOURCE_ROW:
+            return df.index.to_numpy(dtype=np.int64)
+        return np.arange(len(df), dtype=np.int64) + 2
+
+    @staticmethod
+    def _cells(df, hari_list):
+        """Sel hari yang terisi: (posisi baris, indeks kolom hari, nilai str)."""
+        hari = [h for h in hari_list if h in df.columns]
+        values = df[hari].to_numpy(dtype=object)
+        rows, cols = np.nonzero(~pd.isna(values))
+        raw = pd.Series(values[rows, cols], dtype=object).astype(str)
+        return rows, cols, raw
+
+    @staticmethod
+    def _overlaps(df, row, col, start, end, ok):
+        """Range valid yang beririsan dengan range sebelumnya di dokter-poli-hari sama."""
+        overlap = np.zeros(len(row), dtype=bool)
+        if "Nama Dokter" not in df.columns or "Poli Asal" not in df.columns or not ok.any():
+            return overlap
+
+        group = ngroup(df, ["Nama Dokter", "Poli Asal"])[row]
+        idx = np.flatnonzero(ok & (group >= 0))
+        owner = group[idx] * (col.max() + 1) + col[idx]
+        order = np.lexsort((start[idx], owner))
+        o, s, e = owner[order], start[idx][order], end[idx][order]
+
+        # jangkauan akhir terjauh sebelumnya dalam owner yang sama
+        reach = pd.Series(e).groupby(o).cummax().to_numpy()
+        hit = np.zeros(len(o), dtype=bool)
+        hit[1:] = (o[1:] == o[:-1]) & (s[1:] < reach[:-1])
+        overlap[idx[order[hit]]] = True
+        return overlap
@@ -1,12 +1,28 @@
 import pandas as pd
 import re
 
+from app.utils.profiler import profiler
+
+
+FIX_RE = re.compile(r"[^0-9\.\:\-\s]")
+
 
 class DataCleaner:
 
     @staticmethod
-    def clean(df, hari_list, jenis_poli, auto_fix=True):
-        df = df.copy()
+    def clean(df, hari_list, jenis_poli, auto_fix=True, copy=True):
+        df, _ = DataCleaner.clean_block(df, hari_list, jenis_poli, auto_fix, copy)
+        return df
+
+    @staticmethod
+    def clean_block(df, hari_list, jenis_poli, auto_fix=True, copy=True):
+        """
+        Versi vektor dari clean: semua kolom hari dinormalisasi sekaligus.
+        copy=False -> df milik pemanggil dipakai langsung (tanpa salinan).
+        Hasil: (df, jumlah sel yang diubah oleh auto-fix).
+        """
+        if copy:
+            df = df.copy()
 
         required = ["Nama Dokter", "Poli Asal", "Jenis Poli"]
         for c in required:
@@ -15,14 +31,17 @@ class DataCleaner:
 
         df["Jenis Poli"] = df["Jenis Poli"].fillna(jenis_poli)
 
-        for h in hari_list:
-            if h in df.columns and auto_fix:
-                df[h] = df[h].apply(DataCleaner.fix_format)
+        changed = 0
+        cols = [h for h in hari_list if h in df.columns]
+        if cols and auto_fix:
+            with profiler.stage("clean.fix_format", jenis=jenis_poli, cells=len(df) * len(cols)):
+                fixed, changed = DataCleaner.fix_format_block(df[cols])
+                df[cols] = fixed
 
         if hari_list:
             df = df[df[hari_list].notna().any(axis=1)]
 
-        return df
+        return df, changed
 
     @staticmethod
     def fix_format(v):
@@ -33,3 +52,24 @@ class DataCleaner:
         if len(p) == 2:
             return p[0].replace(".", ":") + "-" + p[1].replace(".", ":")
         return v
+
+    @staticmethod
+    def fix_format_block(block):
+        """fix_format untuk satu blok kolom sekaligus -> (blok baru, jumlah sel berubah)."""
+        values = block.to_numpy(dtype=object)
+        flat = pd.Series(values.ravel(), dtype=object)
+        na = flat.isna().to_numpy()
+
+        raw = flat.astype(str)
+        out = (raw.str.replace(FIX_RE, "", regex=True)
+               .str.replace(" ", "", regex=False))
+
+        # tepat satu "-" -> dua bagian -> titik jadi titik dua
+        one_dash = (out.str.count("-") == 1).to_numpy()
+        out[one_dash] = out[one_dash].str.replace(".", ":", regex=False)
+        out[na] = ""
+
+        changed = int((~na & (out != raw).to_numpy()).sum())
+        fixed = pd.DataFrame(out.to_numpy().reshape(values.shape),
+                             index=block.index, columns=block.columns)
+        return fixed, changed
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from .grouping import group_codes, group_reduce, runs
+from .schedule_matrix import as_matrix, REG, POLEKS
+
+
+POLI_CLASH = "Dokter memiliki 2 poli berbeda pada waktu sama"
+RE_CLASH = "Bentrok jam Reguler & Poleks"
+
+
+class ConflictIndex:
+    """
+    Indeks konflik dokter berbasis bitmask: satu hari seorang dokter = bitmask
+    slot (np.packbits) per poli/jenis. Konflik lintas poli & Reguler-vs-Poleks
+    dihitung dengan AND/OR vektor atas seluruh roster sekaligus.
+    """
+
+    def __init__(self, slot_str, keys, poli_clash, re_clash, poli_keys, poli_day, poli_mask):
+        self.slot_str = slot_str
+        self.keys = keys              # DOKTER, HARI (satu baris per dokter-hari)
+        self.poli_clash = poli_clash  # packed uint8 (n_dokter_hari, n_word)
+        self.re_clash = re_clash
+        self.poli_keys = poli_keys    # DOKTER, HARI, POLI ASAL
+        self.poli_day = poli_day      # index dokter-hari untuk tiap baris poli_keys
+        self.poli_mask = poli_mask    # packed uint8, slot aktif per poli
+
+    @classmethod
+    def build(cls, df, slot_str):
+        mat = as_matrix(df, slot_str)
+        bits_r = np.packbits(mat.mask(REG), axis=1)
+        bits_e = np.packbits(mat.mask(POLEKS), axis=1)
+
+        df = mat.meta_frame()
+        keys, day = group_codes(df, ["DOKTER", "HARI"])
+        n = len(keys)
+
+        # Reguler vs Poleks: AND dua mask per dokter-hari
+        re_clash = (group_reduce(day, bits_r, n, np.bitwise_or) &
+                    group_reduce(day, bits_e, n, np.bitwise_or))
+
+        # mask per poli (gabungan R/E), lalu hitung bit yang aktif di >= 2 poli
+        poli_keys, poli = group_codes(df, ["DOKTER", "HARI", "POLI ASAL"])
+        poli_mask = group_reduce(poli, bits_r | bits_e, len(poli_keys), np.bitwise_or)
+        poli_day = group_codes(poli_keys, ["DOKTER", "HARI"])[1]
+
+        # carry-save per urutan poli dalam dokter-hari (loop = jumlah poli maks, kecil)
+        rank = pd.Series(poli_day).groupby(poli_day).cumcount().to_numpy()
+        ones = np.zeros((n, poli_mask.shape[1]), dtype=np.uint8)
+        twos = np.zeros_like(ones)
+        for k in range(rank.max() + 1 if len(rank) else 0):
+            sel = rank == k
+            g, m = poli_day[sel], poli_mask[sel]
+            twos[g] |= ones[g] & m
+            ones[g] |= m
+
+        return cls(slot_str, keys, twos, re_clash, poli_keys, poli_day, poli_mask)
+
+    def patch(self, doctors, sub):
+        """
+        Indeks baru: bagian dokter di `doctors` diganti `sub` (indeks yang
+        dibangun hanya dari baris dokter tsb). Urutan kunci tetap seperti build.
+        """
+        keep = ~self.keys["DOKTER"].isin(doctors).to_numpy()
+        keys = pd.concat([self.keys[keep], sub.keys], ignore_index=True)
+        order = keys.sort_values(["DOKTER", "HARI"], kind="stable").index.to_numpy()
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+
+        # indeks dokter-hari lama yang dipertahankan -> posisi baru
+        keep_p = ~self.poli_keys["DOKTER"].isin(doctors).to_numpy()
+        old_pos = np.cumsum(keep) - 1
+        poli_day = rank[np.concatenate([old_pos[self.poli_day[keep_p]],
+                                        sub.poli_day + keep.sum()]).astype(np.int64)]
+        poli_keys = pd.concat([self.poli_keys[keep_p], sub.poli_keys], ignore_index=True)
+        p_order = poli_keys.sort_values(["DOKTER", "HARI", "POLI ASAL"],
+                                        kind="stable").index.to_numpy()
+
+        return ConflictIndex(
+            self.slot_str,
+            keys.iloc[order].reset_index(drop=True),
+            np.concatenate([self.poli_clash[keep], sub.poli_clash])[order],
+            np.concatenate([self.re_clash[keep], sub.re_clash])[order],
+            poli_keys.iloc[p_order].reset_index(drop=True),
+            poli_day[p_order],
+            np.concatenate([self.poli_mask[keep_p], sub.poli_mask])[p_order],
+        )
+
+    def _unpack(self, packed):
+        return np.unpackbits(packed, axis=1, count=len(self.slot_str)).astype(bool)
+
+    # ======================================================================
+    # Output
+    # ======================================================================
+    def cells(self):
+        """Satu baris per (dokter, hari, slot) yang berkonflik."""
+        poli, re = self._unpack(self.poli_clash), self._unpack(self.re_clash)
+        row, col = np.nonzero(poli | re)
+        return pd.DataFrame({
+            "DOKTER": self.keys["DOKTER"].to_numpy()[row],
+            "HARI": self.keys["HARI"].to_numpy()[row],
+            "SLOT": np.asarray(self.slot_str, dtype=object)[col],
+            "POLI_CLASH": poli[row, col],
+            "RE_CLASH": re[row, col],
+        })
+
+    def report(self):
+        """
+        Laporan sparse per hari: slot konflik berurutan digabung jadi satu
+        range. Kolom: DOKTER, HARI, START, END (idx slot, END eksklusif),
+        KONFLIK, POLI (poli yang aktif di range tsb).
+        """
+        parts = []
+        for order, (text, packed) in enumerate(((POLI_CLASH, self.poli_clash),
+                                                (RE_CLASH, self.re_clash))):
+            row, a, b = runs(self._unpack(packed))
+            parts.append(pd.DataFrame({"DAY": row, "START": a, "END": b,
+                                       "ORDER": order, "KONFLIK": text}))
+        rep = pd.concat(parts, ignore_index=True)
+        rep = rep.sort_values(["DAY", "START", "ORDER"], kind="stable").reset_index(drop=True)
+
+        rep["POLI"] = self._polis_in_runs(rep)
+        day = rep["DAY"].to_numpy()
+        return pd.DataFrame({
+            "DOKTER": self.keys["DOKTER"].to_numpy()[day],
+            "HARI": self.keys["HARI"].to_numpy()[day],
+            "START": rep["START"].to_numpy(),
+            "END": rep["END"].to_numpy(),
+            "KONFLIK": rep["KONFLIK"].to_numpy(),
+            "POLI": rep["POLI"].to_numpy(),
+        })
+
+    def _polis_in_runs(self, rep):
+        if rep.empty:
+            return []
+
+        # pasangkan tiap run dengan semua poli dokter-hari yang sama, lalu AND mask
+        idx = np.arange(len(self.slot_str))
+        run_bits = np.packbits((idx >= rep["START"].to_numpy()[:, None]) &
+                               (idx < rep["END"].to_numpy()[:, None]), axis=1)
+
+        pairs = pd.DataFrame({"RUN": np.arange(len(rep)), "DAY": rep["DAY"].to_numpy()}).merge(
+            pd.DataFrame({"P": np.arange(len(self.poli_day)), "DAY": self.poli_day}), on="DAY")
+        hit = (run_bits[pairs["RUN"]] & self.poli_mask[pairs["P"]]).any(axis=1)
+        pairs = pairs[hit]
+
+        names = self.poli_keys["POLI ASAL"].astype(str).to_numpy()[pairs["P"]]
+        joined = pd.Series(names).groupby(pairs["RUN"].to_numpy()).agg(
+            lambda x: ", ".join(sorted(x)))
+        return joined.reindex(np.arange(len(rep)), fill_value="").to_numpy()
+
+    def map_matrix(self):
+        """(kunci dokter-hari yang punya konflik, matriks int8: 1 konflik poli, 2 R+E)."""
+        poli, re = self._unpack(self.poli_clash), self._unpack(self.re_clash)
+        codes = np.where(re, 2, np.where(poli, 1, 0)).astype(np.int8)
+        any_row = codes.any(axis=1)
+        return self.keys[any_row].reset_index(drop=True), codes[any_row]
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from .grouping import group_reduce
+from .schedule_matrix import REG, POLEKS
+
+
+# indeks sumbu jenis di kubus
+JENIS = ("Reguler", "Poleks")
+
+
+class ScheduleCube:
+    """
+    Kubus hitungan hari × slot × poli × jenis (Reguler/Poleks): jumlah baris
+    jadwal aktif di tiap sel. Dibangun sekali per ScheduleMatrix dengan reduksi
+    NumPy; heatmap, statistik & drill-down tinggal mengiris / menjumlah kubus.
+    """
+
+    def __init__(self, source, slot_str, interval, hari, poli, counts, dokter, dokter_slots, n_rows):
+        self.source = source              # ScheduleMatrix asal (deteksi data basi)
+        self.slot_str = slot_str
+        self.interval = interval
+        self.hari = hari                  # label sumbu 0 (urut config.hari_list)
+        self.poli = poli                  # label sumbu 2
+        self.counts = counts              # int32 (hari, slot, poli, jenis)
+        self.dokter = dokter
+        self.dokter_slots = dokter_slots  # int64 (dokter, jenis) jumlah slot aktif
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, mat, hari_list=(), interval=None):
+        # default: interval grid matriks (frame lama tanpa interval -> jarak slot)
+        minutes = mat.grid.minutes
+        interval = (interval or mat.grid.interval
+                    or (int(minutes[1] - minutes[0]) if len(minutes) > 1 else 60))
+
+        # sumbu hari: semua hari config (walau tanpa jadwal, seperti reindex lama),
+        # hari lain (jika ada) di belakang
+        cats = list(mat.meta["HARI"].categories)
+        hari = list(hari_list) + [h for h in cats if h not in hari_list]
+        h = pd.Index(hari).get_indexer(cats)[mat.meta["HARI"].codes]
+        h[mat.meta["HARI"].codes < 0] = -1
+
+        poli_cat = mat.meta["POLI ASAL"]
+        order = np.argsort(np.asarray(poli_cat.categories, dtype=object), kind="stable")
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        p = np.where(poli_cat.codes >= 0, rank[poli_cat.codes], -1)
+        poli = list(np.asarray(poli_cat.categories, dtype=object)[order])
+
+        n_h, n_p, n_s = len(hari), len(poli), len(mat.slot_str)
+        cell = np.where((h >= 0) & (p >= 0), h * n_p + p, -1)
+        counts = np.zeros((n_h, n_s, n_p, len(JENIS)), dtype=np.int32)
+        per_type = []
+        for t, code in enumerate((REG, POLEKS)):
+            mask = mat.mask(code).astype(np.int32)
+            per = group_reduce(cell, mask, n_h * n_p, np.add)
+            counts[..., t] = per.reshape(n_h, n_p, n_s).transpose(0, 2, 1)
+            per_type.append(mask.sum(axis=1))
+
+        dok_cat = mat.meta["DOKTER"]
+        dokter_slots = group_reduce(dok_cat.codes, np.stack(per_type, axis=1).astype(np.int64),
+                                    len(dok_cat.categories), np.add)
+        return cls(mat, mat.slot_str, interval, hari, poli, counts,
+                   list(dok_cat.categories), dokter_slots, len(mat))
+
+    # ======================================================================
+    # Ringkasan
+    # ======================================================================
+    def totals(self):
+        """(total sel slot, slot Reguler, slot Poleks)."""
+        r, e = self.counts.sum(axis=(0, 1, 2))
+        return self.n_rows * len(self.slot_str), int(r), int(e)
+
+    def poleks_per_slot(self):
+        """Jumlah baris Poleks aktif per hari × slot (semua poli)."""
+        return self.counts[..., 1].sum(axis=2)
+
+    def heatmap(self, max_poleks=None, poli=None):
+        """
+        Status hari × slot: 0 kosong, 1 hanya Reguler, 2 ada Poleks,
+        3 Poleks melewati max_poleks. poli: batasi ke satu poli (drill-down).
+        """
+        counts = self.counts if poli is None else self.counts[:, :, [self.poli.index(poli)]]
+        r, e = counts[..., 0].sum(axis=2), counts[..., 1].sum(axis=2)
+        status = np.select([e > 0, r > 0], [2, 1], 0)
+        if max_poleks is not None:
+            status[(self.poleks_per_slot() > max_poleks) & (e > 0)] = 3
+        return pd.DataFrame(status, index=self.hari, columns=self.slot_str)
+
+    # ======================================================================
+    # Drill-down
+    # ======================================================================
+    def poli_utilization(self):
+        """Per poli: jam layanan per jenis, % sel hari×slot terisi, dokter serentak maks."""
+        hours = self.counts.sum(axis=(0, 1)) * self.interval / 60
+        active = self.counts.sum(axis=3)
+        cells = len(self.hari) * len(self.slot_str)
+        return pd.DataFrame({
+            "POLI": self.poli,
+            "JAM REG": hours[:, 0],
+            "JAM POLEKS": hours[:, 1],
+            "TERISI (%)": (active > 0).sum(axis=(0, 1)) / cells * 100 if cells else 0.0,
+            "PUNCAK DOKTER": active.max(axis=(0, 1)) if cells else 0,
+        }).iloc[np.argsort(-hours.sum(axis=1), kind="stable")].reset_index(drop=True)
+
+    def doctor_load(self):
+        """Per dokter: jam Reguler, jam Poleks & total, urut beban terbesar."""
+        hours = self.dokter_slots * self.interval / 60
+        out = pd.DataFrame({"DOKTER": self.dokter, "JAM REG": hours[:, 0],
+                            "JAM POLEKS": hours[:, 1]})
+        out["TOTAL"] = out["JAM REG"] + out["JAM POLEKS"]
+        return out.sort_values("TOTAL", ascending=False, kind="stable", ignore_index=True)
+
+    def overflow(self, max_poleks):
+        """Sel hari × slot dengan Poleks melebihi max_poleks: HARI, SLOT, POLEKS, LEBIH."""
+        per_slot = self.poleks_per_slot()
+        h, s = np.nonzero(per_slot > max_poleks)
+        return pd.DataFrame({
+            "HARI": np.asarray(self.hari, dtype=object)[h],
+            "SLOT": np.asarray(self.slot_str, dtype=object)[s],
+            "POLEKS": per_slot[h, s],
+            "LEBIH": per_slot[h, s] - max_poleks,
+        })
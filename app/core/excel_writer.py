@@ -1,233 +1,298 @@
 from openpyxl import load_workbook, Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
 from openpyxl.chart import BarChart, Reference
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.utils import get_column_letter
 import io
-from datetime import datetime, timedelta
+from copy import copy
+import numpy as np
 import pandas as pd
+from .workbook import ParsedWorkbook
+from .aggregator import RecapAggregator, RunningRecap
+from .grouping import runs
+from .roster_calendar import WEEKDAY_HARI
+from .schedule_matrix import as_matrix, REG, POLEKS
+from app.utils.parallel import run_calls
+from app.utils.profiler import profiler
+
+
+class ColumnWidths:
+    """
+    Lebar kolom maksimum yang dicatat saat baris ditulis (tanpa scan ulang).
+    mode: "auto" semua baris, "sample" hanya N baris pertama, "fixed" lebar tetap.
+    """
+
+    def __init__(self, mode="auto", sample_rows=1000, fixed=12):
+        self.mode = mode
+        self.sample_rows = sample_rows
+        self.fixed = fixed
+        self.widths = []
+        self.rows = 0
+
+    def _active(self):
+        return self.mode == "auto" or (self.mode == "sample" and self.rows <= self.sample_rows)
+
+    def update(self, row):
+        self.rows += 1
+        if not self._active():
+            if len(row) > len(self.widths):
+                self.widths += [0] * (len(row) - len(self.widths))
+            return
+
+        for i, v in enumerate(row):
+            n = len(str(v)) if v else 0
+            if i >= len(self.widths):
+                self.widths.append(n)
+            elif n > self.widths[i]:
+                self.widths[i] = n
+
+    def update_frame(self, df, headers):
+        """Versi vektor untuk frame besar (sheet Jadwal)."""
+        if len(headers) > len(self.widths):
+            self.widths += [0] * (len(headers) - len(self.widths))
+        if self.mode == "fixed":
+            self.rows += len(df)
+            return
+
+        if self.mode == "sample":
+            df = df.head(max(self.sample_rows - self.rows, 0))
+        self.rows += len(df)
+
+        for i, h in enumerate(headers):
+            if h in df.columns and len(df):
+                col = df[h]
+                lens = col.astype(str).str.len().where(col.notna() & (col != ""), 0)
+                self.widths[i] = max(self.widths[i], int(lens.max()))
+
+    def values(self):
+        if self.mode == "fixed":
+            return [self.fixed] * len(self.widths)
+        return [w + 2 for w in self.widths]
+
+    def apply(self, ws):
+        for i, w in enumerate(self.values(), 1):
+            ws.column_dimensions[get_column_letter(i)].width = w
 
 
 class ExcelWriter:
 
+    CONFLICT_HEADER = ["DOKTER", "HARI", "WAKTU", "KONFLIK", "POLI"]
+    # sheet hasil (urutan workbook) yang ditulis mode chunk
+    CHUNK_SHEETS = ["Jadwal", "Rekap Layanan", "Rekap Poli", "Rekap Dokter",
+                    "Peak Hour Analysis", "Conflict Dokter", "Peta Konflik Dokter",
+                    "Grafik Beban Poli"]
+
     def __init__(self, config):
         self.config = config
+        self.aggregator = RecapAggregator(config)
 
-        # warna slot
-        self.fill_r = PatternFill(start_color="00FF00", fill_type="solid")  # Hijau
-        self.fill_e = PatternFill(start_color="0000FF", fill_type="solid")  # Biru
-        self.fill_over = PatternFill(start_color="FF0000", fill_type="solid")  # Merah
+        # warna slot (end_color ikut diisi agar bisa dipakai juga sebagai dxf aturan)
+        self.fill_r = PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid")  # Hijau
+        self.fill_e = PatternFill(start_color="0000FF", end_color="0000FF", fill_type="solid")  # Biru
+        self.fill_over = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")  # Merah
 
-        # warna konflik
-        self.fill_conflict_normal = PatternFill(start_color="FFFF00", fill_type="solid")  # kuning
-        self.fill_conflict_hard = PatternFill(start_color="FF0000", fill_type="solid")     # merah
+        # warna konflik (dipakai aturan conditional formatting -> perlu end_color)
+        self.fill_conflict_normal = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")  # kuning
+        self.fill_conflict_hard = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")     # merah
 
         # border header
         self.border_header = Border(bottom=Side(border_style="thick"))
 
-    # ======================================================================
-    # HELPER – gabung range waktu
-    # ======================================================================
-    def _combine_ranges(self, slots, interval):
-        if not slots:
-            return []
-        ts = sorted(datetime.strptime(t, "%H:%M") for t in slots)
-        ranges = []
-        start = ts[0]
-        end = start + timedelta(minutes=interval)
-
-        for t in ts[1:]:
-            if t == end:
-                end = t + timedelta(minutes=interval)
-            else:
-                ranges.append((start, end))
-                start = t
-                end = start + timedelta(minutes=interval)
+        # named style header (mode style "rules")
+        self.header_style = NamedStyle(name="Header Jadwal", font=Font(bold=True),
+                                       border=self.border_header,
+                                       alignment=Alignment(horizontal="center"))
 
-        ranges.append((start, end))
-        return ranges
-
-    def _format_range(self, a, b):
-        return f"{a.strftime('%H.%M')}–{b.strftime('%H.%M')}"
+    @property
+    def use_rules(self):
+        return self.config.style_mode == "rules"
 
     # ======================================================================
-    # 1. Peak Hour Analysis
+    # HELPER – format range waktu & tulis sheet
     # ======================================================================
-    def _create_peak_hour(self, wb, df, slot_str):
-        if "Peak Hour Analysis" in wb.sheetnames:
-            del wb["Peak Hour Analysis"]
-
-        ws = wb.create_sheet("Peak Hour Analysis")
-        ws.append(["HARI", "SLOT", "JUMLAH", "KATEGORI"])
+    @staticmethod
+    def _fmt_minutes(m):
+        m = int(m) % (24 * 60)
+        return f"{m // 60:02d}.{m % 60:02d}"
 
-        for hari, g in df.groupby("HARI"):
-            counts = {s: 0 for s in slot_str}
+    def _format_range(self, a, b):
+        return f"{self._fmt_minutes(a)}–{self._fmt_minutes(b)}"
 
-            for _, row in g.iterrows():
-                for slot in slot_str:
-                    if row.get(slot) in ["R", "E"]:
-                        counts[slot] += 1
+    def _widths(self):
+        return ColumnWidths(self.config.width_mode, self.config.width_sample_rows,
+                            self.config.width_fixed)
 
-            max_v = max(counts.values())
-            kategori = "High Load" if max_v >= 10 else "Medium" if max_v >= 5 else "Low"
+    def _sheet_from_rows(self, wb, title, header, rows):
+        if title in wb.sheetnames:
+            del wb[title]
 
-            for slot, val in counts.items():
-                if val == max_v:
-                    ws.append([hari, slot, val, kategori])
+        ws = wb.create_sheet(title)
+        widths = self._widths()
+        for r in [header] + list(rows):
+            ws.append(r)
+            widths.update(r)
+        widths.apply(ws)
+        return ws
 
     # ======================================================================
-    # 2. Conflict Checking Dokter (tekstual)
+    # Tabel rekap: isi semua sheet dihitung (process pool bila config.workers > 1),
+    # materialisasi openpyxl tetap serial dengan urutan sheet tetap
     # ======================================================================
-    def _create_conflict_doctor(self, wb, df, slot_str):
-        if "Conflict Dokter" in wb.sheetnames:
-            del wb["Conflict Dokter"]
-
-        ws = wb.create_sheet("Conflict Dokter")
-        ws.append(["DOKTER", "HARI", "SLOT", "KONFLIK"])
-
-        for (dokter, hari), g in df.groupby(["DOKTER", "HARI"]):
-            for slot in slot_str:
-                vals = g[slot].unique()
-
-                # Konflik mengajar 2 poli
-                if len(vals) > 1 and any(v in ["R", "E"] for v in vals):
-                    ws.append([dokter, hari, slot,
-                               "Dokter memiliki 2 poli berbeda pada waktu sama"])
-
-                # Konflik Reguler & Poleks
-                if "R" in vals and "E" in vals:
-                    ws.append([dokter, hari, slot,
-                               "Bentrok jam Reguler & Poleks"])
+    def _recap_tables(self, agg, titles=None):
+        """List (judul, header, rows) dalam urutan sheet output (titles: subset saja)."""
+        specs = [
+            ("Rekap Layanan", ["POLI", "HARI", "DOKTER", "JENIS", "WAKTU LAYANAN"],
+             self._rows_rekap_layanan),
+            ("Rekap Poli", ["POLI", "HARI", "TOTAL REG", "TOTAL POLEKS", "TOTAL"],
+             self._rows_rekap_poli),
+            ("Rekap Dokter", ["DOKTER", "HARI", "SHIFT", "TOTAL JAM"],
+             self._rows_rekap_dokter),
+            ("Peak Hour Analysis", ["HARI", "SLOT", "JUMLAH", "KATEGORI"],
+             self._rows_peak_hour),
+            ("Conflict Dokter", self.CONFLICT_HEADER, self._rows_conflict_doctor),
+            # header peta konflik ikut kolom slot -> dikembalikan oleh fungsinya
+            ("Peta Konflik Dokter", None, self._rows_conflict_map),
+        ]
+        if titles is not None:
+            specs = [spec for spec in specs if spec[0] in titles]
+
+        with profiler.stage("write.rows", sheets=len(specs), workers=self.config.workers):
+            results = run_calls([(build, (agg,)) for _, _, build in specs], self.config.workers)
+
+        tables = []
+        for (title, header, _), rows in zip(specs, results):
+            if header is None:
+                header, rows = rows
+            tables.append((title, header, rows))
+        return tables
 
     # ======================================================================
-    # 3. VISUAL CONFLICT MAP
+    # 1. Peak Hour Analysis
     # ======================================================================
-    def _create_conflict_map(self, wb, df, slot_str):
-        if "Peta Konflik Dokter" in wb.sheetnames:
-            del wb["Peta Konflik Dokter"]
-
-        ws = wb.create_sheet("Peta Konflik Dokter")
-
-        doctors = sorted(df["DOKTER"].unique())
-        ws.append(["SLOT"] + doctors)
-
-        # kosongkan matrix
-        for slot in slot_str:
-            ws.append([slot] + [""] * len(doctors))
-
-        doc_col = {doc: idx + 2 for idx, doc in enumerate(doctors)}
-
-        for (dokter, hari), g in df.groupby(["DOKTER", "HARI"]):
-            col = doc_col[dokter]
+    def _rows_peak_hour(self, agg):
+        rows = []
+        for hari, counts in agg.peak_counts.iterrows():
+            max_v = int(counts.max())
+            kategori = "High Load" if max_v >= 10 else "Medium" if max_v >= 5 else "Low"
 
-            for slot in slot_str:
-                vals = g[slot].unique()
-                row = slot_str.index(slot) + 2
+            for slot in counts.index[counts.to_numpy() == max_v]:
+                rows.append([hari, slot, max_v, kategori])
+        return rows
 
-                # konflik poli berbeda
-                if len(vals) > 1 and any(v in ["R", "E"] for v in vals):
-                    ws.cell(row=row, column=col).fill = self.fill_conflict_normal
+    # ======================================================================
+    # 2. Conflict Checking Dokter (tekstual, per hari, slot berurutan digabung)
+    # ======================================================================
+    def _rows_conflict_doctor(self, agg):
+        minutes = self.aggregator.slot_minutes(agg.slot_str)
+        return [[dokter, hari, self._format_range(minutes[a], minutes[b - 1] + agg.interval),
+                 konflik, poli]
+                for dokter, hari, a, b, konflik, poli
+                in agg.conflict_index.report().itertuples(index=False)]
 
-                # konflik R+E
-                if "R" in vals and "E" in vals:
-                    ws.cell(row=row, column=col).fill = self.fill_conflict_hard
+    # ======================================================================
+    # 3. VISUAL CONFLICT MAP (dokter-hari × slot, conditional formatting)
+    # ======================================================================
+    def _rows_conflict_map(self, agg):
+        """Hanya dokter-hari yang berkonflik; 1 = 2 poli, 2 = bentrok R & E."""
+        keys, codes = agg.conflict_index.map_matrix()
+        header = ["DOKTER", "HARI"] + agg.slot_str
+        rows = [[dokter, hari] + [int(c) if c else None for c in row]
+                for (dokter, hari), row in zip(keys.itertuples(index=False, name=None), codes)]
+        return header, rows
+
+    def _conflict_map_rules(self, ws, n_cols, n_rows):
+        if not n_rows or n_cols <= 2:
+            return
+        area = f"C2:{get_column_letter(n_cols)}{n_rows + 1}"
+        ws.conditional_formatting.add(area, CellIsRule(operator="equal", formula=["1"],
+                                                       fill=self.fill_conflict_normal))
+        ws.conditional_formatting.add(area, CellIsRule(operator="equal", formula=["2"],
+                                                       fill=self.fill_conflict_hard))
 
     # ======================================================================
     # 4. Rekap Layanan Dokter (range waktu)
     # ======================================================================
-    def _create_rekap_layanan(self, wb, df, slot_str):
-        if "Rekap Layanan" in wb.sheetnames:
-            del wb["Rekap Layanan"]
-
-        ws = wb.create_sheet("Rekap Layanan")
-        ws.append(["POLI", "HARI", "DOKTER", "JENIS", "WAKTU LAYANAN"])
-
-        interval = self.config.interval_minutes
-
-        for (poli, hari, dokter), g in df.groupby(["POLI ASAL", "HARI", "DOKTER"]):
-            R = [s for s in slot_str if g.iloc[0].get(s) == "R"]
-            E = [s for s in slot_str if g.iloc[0].get(s) == "E"]
-
-            for a, b in self._combine_ranges(R, interval):
-                ws.append([poli, hari, dokter, "Reguler", self._format_range(a, b)])
-            for a, b in self._combine_ranges(E, interval):
-                ws.append([poli, hari, dokter, "Poleks", self._format_range(a, b)])
+    def _rows_rekap_layanan(self, agg):
+        return [[poli, hari, dokter, jenis, self._format_range(a, b)]
+                for poli, hari, dokter, jenis, a, b in agg.layanan.itertuples(index=False)]
 
     # ======================================================================
     # 5. Rekap Poli
     # ======================================================================
-    def _create_rekap_poli(self, wb, df, slot_str):
-        if "Rekap Poli" in wb.sheetnames:
-            del wb["Rekap Poli"]
-
-        ws = wb.create_sheet("Rekap Poli")
-        ws.append(["POLI", "HARI", "TOTAL REG", "TOTAL POLEKS", "TOTAL"])
-
-        interval = self.config.interval_minutes
-
-        for (poli, hari), g in df.groupby(["POLI ASAL", "HARI"]):
-            tot_r = sum((g.iloc[0].get(s) == "R") * interval/60 for s in slot_str)
-            tot_e = sum((g.iloc[0].get(s) == "E") * interval/60 for s in slot_str)
-            ws.append([poli, hari, round(tot_r,2), round(tot_e,2), round(tot_r+tot_e,2)])
+    def _rows_rekap_poli(self, agg):
+        return [[poli, hari, round(tot_r, 2), round(tot_e, 2), round(tot_r + tot_e, 2)]
+                for poli, hari, tot_r, tot_e in agg.poli_hours.itertuples(index=False)]
 
     # ======================================================================
     # 6. Rekap Dokter + Penggabungan shift otomatis
     # ======================================================================
-    def _create_rekap_dokter(self, wb, df, slot_str):
-        if "Rekap Dokter" in wb.sheetnames:
-            del wb["Rekap Dokter"]
-
-        ws = wb.create_sheet("Rekap Dokter")
-        ws.append(["DOKTER", "HARI", "SHIFT", "TOTAL JAM"])
-
-        interval = self.config.interval_minutes
-
-        for (dokter, hari), g in df.groupby(["DOKTER", "HARI"]):
-
-            active = [s for s in slot_str if g.iloc[0].get(s) in ["R", "E"]]
-            merged = self._combine_ranges(active, interval)
-
-            for a, b in merged:
-                dur = (b - a).seconds / 3600
-                ws.append([dokter, hari, self._format_range(a,b), round(dur,2)])
+    def _rows_rekap_dokter(self, agg):
+        return [[dokter, hari, self._format_range(a, b), round((b - a) / 60, 2)]
+                for dokter, hari, a, b in agg.dokter_shifts.itertuples(index=False)]
 
     # ======================================================================
     # 7. Grafik Beban Poli
     # ======================================================================
-    def _create_grafik_poli(self, wb):
+    def _create_grafik_poli(self, wb, rekap_poli_rows=None):
         if "Grafik Beban Poli" in wb.sheetnames:
             del wb["Grafik Beban Poli"]
 
         ws = wb.create_sheet("Grafik Beban Poli")
         ws["A1"] = "Grafik Beban Poli per Minggu"
 
-        rp = wb["Rekap Poli"]
-        table = {}
+        if rekap_poli_rows is None:
+            rekap_poli_rows = wb["Rekap Poli"].iter_rows(min_row=2, values_only=True)
+
+        widths = self._widths()
+        widths.update([ws["A1"].value])
+        for row in [["POLI", "TOTAL JAM"]] + self._rows_grafik_poli(rekap_poli_rows):
+            ws.append(row)
+            widths.update(row)
+        widths.apply(ws)
 
-        for row in rp.iter_rows(min_row=2, values_only=True):
+        ws.add_chart(self._chart_poli(ws, ws.max_row), "E5")
+
+    def _rows_grafik_poli(self, rekap_poli_rows):
+        table = {}
+        for row in rekap_poli_rows:
             poli = row[0]
             total = row[4]
             table[poli] = table.get(poli, 0) + total
+        return [[p, t] for p, t in table.items()]
 
-        ws.append(["POLI", "TOTAL JAM"])
-        for p, t in table.items():
-            ws.append([p, t])
-
+    def _chart_poli(self, ws, max_row):
         chart = BarChart()
         chart.title = "Beban Poli"
 
-        data = Reference(ws, min_col=2, min_row=2, max_row=ws.max_row)
-        cats = Reference(ws, min_col=1, min_row=2, max_row=ws.max_row)
+        data = Reference(ws, min_col=2, min_row=2, max_row=max_row)
+        cats = Reference(ws, min_col=1, min_row=2, max_row=max_row)
 
         chart.add_data(data)
         chart.set_categories(cats)
-        ws.add_chart(chart, "E5")
+        return chart
 
     # ======================================================================
     # UTAMA – menulis semua sheet
     # ======================================================================
-    def write(self, source_file, df, slot_str):
-
-        wb = load_workbook(source_file)
-
+    def write(self, source_file, df, slot_str, streaming=None, agg=None):
+        """agg: RecapAggregates yang sudah ada (mis. hasil tambalan editor) -> tanpa build ulang."""
+        if streaming is None:
+            streaming = self.config.streaming_export
+
+        # df boleh ScheduleMatrix atau frame lebar lama; diproses sebagai matriks
+        mat = as_matrix(df, slot_str, self.config.interval_minutes)
+        with profiler.stage("write", rows=len(mat), streaming=bool(streaming),
+                            style=self.config.style_mode):
+            if streaming:
+                return self.write_streaming(source_file, mat, mat.slot_str, agg=agg)
+
+            if isinstance(source_file, ParsedWorkbook):
+                return self._write_into(source_file.open_workbook(), mat, agg)
+            return self._write_into(load_workbook(source_file), mat, agg)
+
+    def _write_into(self, wb, mat, agg=None):
+        slot_str = mat.slot_str
         if "Jadwal" in wb.sheetnames:
             del wb["Jadwal"]
 
@@ -236,68 +301,429 @@ class ExcelWriter:
         headers = ["POLI ASAL", "JENIS POLI", "HARI", "DOKTER"] + slot_str
         ws.append(headers)
 
-        for _, r in df.iterrows():
-            ws.append([r.get(h, "") for h in headers])
+        # mode rules: sel kosong tidak ditulis sama sekali
+        empty = None if self.use_rules else ""
+        meta = mat.meta_frame()
+        text = np.array([empty, "R", "E"], dtype=object)[mat.slots]
+        with profiler.stage("write.sheet", sheet="Jadwal", rows=len(mat),
+                            cells=len(mat) * len(headers)):
+            for m, row_text in zip(meta.itertuples(index=False, name=None), text):
+                ws.append([empty if v == "" else v for v in m] + list(row_text))
+
+        # kolom slot tidak perlu diukur: label "HH:MM" selalu lebih lebar dari "R"/"E"
+        with profiler.stage("style.widths", sheet="Jadwal"):
+            widths = self._widths()
+            widths.update(headers)
+            widths.update_frame(meta, headers)
+            widths.apply(ws)
 
         # pewarnaan slot
-        self.apply_styles(ws, df, slot_str)
-
-        # semua fitur rekap
-        self._create_rekap_layanan(wb, df, slot_str)
-        self._create_rekap_poli(wb, df, slot_str)
-        self._create_rekap_dokter(wb, df, slot_str)
-        self._create_peak_hour(wb, df, slot_str)
-        self._create_conflict_doctor(wb, df, slot_str)
-        self._create_conflict_map(wb, df, slot_str)
-        self._create_grafik_poli(wb)
-
-        # finishing style
-        self._auto_width_all_sheets(wb)
-        self._style_headers_all(wb)
-        self._freeze_headers_all(wb)
+        with profiler.stage("style.slots", mode=self.config.style_mode,
+                            cells=len(mat) * len(slot_str)):
+            if self.use_rules:
+                self.apply_style_rules(ws, mat, slot_str)
+            else:
+                self.apply_styles(ws, mat, slot_str)
+
+        # semua fitur rekap — agregasi sekali, sheet hanya memformat
+        if agg is None:
+            with profiler.stage("write.aggregate", rows=len(mat)):
+                agg = self.aggregator.build(mat, slot_str)
+        tables = self._recap_tables(agg)
+        for title, header, rows in tables:
+            with profiler.stage("write.sheet", sheet=title, rows=len(rows)):
+                ws = self._sheet_from_rows(wb, title, header, rows)
+                if title == "Peta Konflik Dokter":
+                    self._conflict_map_rules(ws, len(header), len(rows))
+        with profiler.stage("write.sheet", sheet="Grafik Beban Poli"):
+            self._create_grafik_poli(wb, dict((t, r) for t, _, r in tables)["Rekap Poli"])
+
+        # finishing style (lebar kolom sudah dicatat saat baris ditulis)
+        with profiler.stage("style.headers", sheets=len(wb.worksheets)):
+            self._style_headers_all(wb)
+            self._freeze_headers_all(wb)
+
+        with profiler.stage("write.save"):
+            buf = io.BytesIO()
+            wb.save(buf)
+            buf.seek(0)
+        return buf
 
-        buf = io.BytesIO()
-        wb.save(buf)
-        buf.seek(0)
+    # ======================================================================
+    # MODE STREAMING – workbook write_only, tiap baris ditulis sekali
+    # ======================================================================
+    def write_streaming(self, source_file, df, slot_str, copy_source=None, agg=None):
+        if copy_source is None:
+            copy_source = self.config.export_copy_source
+        mat = as_matrix(df, slot_str, self.config.interval_minutes)
+        slot_str = mat.slot_str
+
+        wb = Workbook(write_only=True)
+        generated = ["Jadwal", "Rekap Layanan", "Rekap Poli", "Rekap Dokter",
+                     "Peak Hour Analysis", "Conflict Dokter", "Peta Konflik Dokter",
+                     "Grafik Beban Poli"]
+
+        if copy_source and source_file is not None:
+            with profiler.stage("write.copy_source"):
+                self._stream_source_sheets(wb, source_file, skip=generated)
+
+        protos = None
+        headers = ["POLI ASAL", "JENIS POLI", "HARI", "DOKTER"] + slot_str
+
+        # --- Jadwal: warna slot sudah final saat baris ditulis
+        ws = wb.create_sheet("Jadwal")
+        protos = self._stream_protos(ws)
+        meta = mat.meta_frame()
+        self._stream_begin_jadwal(ws, protos, headers, meta)
+
+        codes = self._slot_codes(mat, slot_str)
+        with profiler.stage("write.sheet", sheet="Jadwal", rows=len(mat),
+                            cells=len(mat) * len(headers)):
+            self._stream_jadwal_rows(ws, protos, meta, codes)
+            if self.use_rules:
+                self._slot_rules(ws, codes)
+
+        # --- rekap
+        if agg is None:
+            with profiler.stage("write.aggregate", rows=len(mat)):
+                agg = self.aggregator.build(mat, slot_str)
+        tables = self._recap_tables(agg)
+        for title, header, rows in tables:
+            with profiler.stage("write.sheet", sheet=title, rows=len(rows)):
+                ws = self._stream_sheet(wb, protos, title, header, rows)
+                # peta konflik: warna lewat conditional formatting, bukan fill per sel
+                if title == "Peta Konflik Dokter":
+                    self._conflict_map_rules(ws, len(header), len(rows))
+        rekap_poli = dict((t, r) for t, _, r in tables)["Rekap Poli"]
+
+        # --- grafik
+        grafik = [["POLI", "TOTAL JAM"]] + self._rows_grafik_poli(rekap_poli)
+        ws = self._stream_sheet(wb, protos, "Grafik Beban Poli",
+                                ["Grafik Beban Poli per Minggu", None], grafik)
+        ws.add_chart(self._chart_poli(ws, len(grafik) + 1), "E5")
+
+        with profiler.stage("write.save"):
+            buf = io.BytesIO()
+            wb.save(buf)
+            buf.seek(0)
         return buf
 
     # ======================================================================
-    # Pewarnaan slot (tanpa border antar hari)
+    # MODE CHUNK – potongan ScheduleMatrix (Scheduler.iter_chunks) ditulis
+    # begitu datang; hanya agregat berjalan yang disimpan sampai akhir
     # ======================================================================
-    def apply_styles(self, ws, df, slot_str):
+    def write_chunked(self, source_file, chunks, slot_str, out=None, copy_source=None):
+        """
+        chunks: iterable ScheduleMatrix, semua baris satu dokter dalam satu potongan.
+        Jadwal & rekap per dokter ditulis per potongan (lebar kolom dari potongan
+        pertama); Rekap Poli, Peak Hour & Grafik dari RunningRecap di akhir.
+        Urutan baris Jadwal & Rekap Layanan = per potongan (di tiap potongan
+        Reguler lalu Poleks), bukan urutan global ekspor biasa; isi baris sama.
+        Tidak diurut ulang di akhir karena itu butuh semua baris di memori.
+        out: path / file tujuan (default BytesIO yang dikembalikan).
+        """
+        if copy_source is None:
+            copy_source = self.config.export_copy_source
+
+        wb = Workbook(write_only=True)
+        if copy_source and source_file is not None:
+            with profiler.stage("write.copy_source"):
+                self._stream_source_sheets(wb, source_file, skip=self.CHUNK_SHEETS)
+
+        # urutan sheet = urutan create_sheet; isi diisi bergantian per potongan
+        sheets = {title: wb.create_sheet(title) for title in self.CHUNK_SHEETS}
+        protos = self._stream_protos(sheets["Jadwal"])
+        streamed = ("Rekap Layanan", "Rekap Dokter", "Conflict Dokter", "Peta Konflik Dokter")
+        written = dict.fromkeys(sheets, 0)
+        running = RunningRecap()
+        carry = {}
+
+        for i, mat in enumerate(chunks):
+            slot_str = mat.slot_str
+            with profiler.stage("write.chunk", chunk=i, rows=len(mat)):
+                ws = sheets["Jadwal"]
+                meta = mat.meta_frame()
+                if not i:
+                    headers = ["POLI ASAL", "JENIS POLI", "HARI", "DOKTER"] + slot_str
+                    self._stream_begin_jadwal(ws, protos, headers, meta)
+                codes = self._slot_codes(mat, slot_str, carry)
+                self._stream_jadwal_rows(ws, protos, meta, codes)
+                if self.use_rules:
+                    self._over_rules(ws, codes, written["Jadwal"])
+                written["Jadwal"] += len(mat)
+
+                agg = self.aggregator.build(mat, slot_str)
+                running.add(agg)
+                for title, header, rows in self._recap_tables(agg, streamed):
+                    ws = sheets[title]
+                    if not i:
+                        self._stream_begin(ws, protos, header, rows)
+                    for r in rows:
+                        ws.append(r)
+                    written[title] += len(rows)
+
+        self._base_rules(sheets["Jadwal"], written["Jadwal"], len(slot_str))
+        self._conflict_map_rules(sheets["Peta Konflik Dokter"], 2 + len(slot_str),
+                                 written["Peta Konflik Dokter"])
+
+        # --- tabel dari agregat berjalan
+        running.finish()
+        if running.poli_hours is None:
+            running.poli_hours = pd.DataFrame(columns=["POLI", "HARI", "REG", "POLEKS"])
+            running.peak_counts = pd.DataFrame(columns=slot_str)
+        rekap_poli = self._rows_rekap_poli(running)
+        self._stream_begin(sheets["Rekap Poli"], protos,
+                           ["POLI", "HARI", "TOTAL REG", "TOTAL POLEKS", "TOTAL"], rekap_poli)
+        for r in rekap_poli:
+            sheets["Rekap Poli"].append(r)
+        peak = self._rows_peak_hour(running)
+        self._stream_begin(sheets["Peak Hour Analysis"], protos,
+                           ["HARI", "SLOT", "JUMLAH", "KATEGORI"], peak)
+        for r in peak:
+            sheets["Peak Hour Analysis"].append(r)
+
+        ws = sheets["Grafik Beban Poli"]
+        grafik = [["POLI", "TOTAL JAM"]] + self._rows_grafik_poli(rekap_poli)
+        self._stream_begin(ws, protos, ["Grafik Beban Poli per Minggu", None], grafik)
+        for r in grafik:
+            ws.append(r)
+        ws.add_chart(self._chart_poli(ws, len(grafik) + 1), "E5")
+
+        with profiler.stage("write.save"):
+            buf = out if out is not None else io.BytesIO()
+            wb.save(buf)
+            if out is None:
+                buf.seek(0)
+        return buf
 
-        counter = {h: {s: 0 for s in slot_str} for h in df["HARI"].unique()}
-        row_idx = 2
+    # ======================================================================
+    # ROSTER BERTANGGAL – satu sheet per tanggal dari RosterCalendar
+    # ======================================================================
+    def write_calendar(self, calendar, start, end):
+        """
+        Sheet "Beban Harian" + satu sheet per tanggal yang punya jadwal.
+        Tanggal dibentuk satu per satu (calendar.occurrences) dan langsung
+        ditulis ke workbook write_only; ekspansi penuh tidak pernah di memori.
+        """
+        wb = Workbook(write_only=True)
+        load = calendar.day_load(start, end)
+        ws = wb.create_sheet("Beban Harian")
+        protos = self._stream_protos(ws)
+        rows = [list(r) for r in load.itertuples(index=False, name=None)]
+        self._stream_begin(ws, protos, list(load.columns), rows)
+        for r in rows:
+            ws.append(r)
+
+        headers = ["POLI ASAL", "JENIS POLI", "HARI", "DOKTER"] + calendar.template.slot_str
+        for day, mat in calendar.occurrences(start, end):
+            if not len(mat):
+                continue
+            with profiler.stage("write.sheet", sheet=str(day), rows=len(mat)):
+                ws = wb.create_sheet(f"{day:%Y-%m-%d} {WEEKDAY_HARI[day.weekday()]}")
+                meta = mat.meta_frame()
+                self._stream_begin_jadwal(ws, protos, headers, meta)
+                codes = self._slot_codes(mat, mat.slot_str)
+                self._stream_jadwal_rows(ws, protos, meta, codes)
+                if self.use_rules:
+                    self._slot_rules(ws, codes)
+
+        with profiler.stage("write.save"):
+            buf = io.BytesIO()
+            wb.save(buf)
+            buf.seek(0)
+        return buf
 
-        for rec in df.to_dict("records"):
-            hari = rec["HARI"]
+    def _stream_protos(self, ws):
+        """Style jadi per jenis sel; disalin ke tiap WriteOnlyCell tanpa lookup ulang."""
+        if self.use_rules:
+            header = {"style": self._register_header_style(ws.parent)}
+        else:
+            header = {"font": Font(bold=True), "border": self.border_header,
+                      "alignment": Alignment(horizontal="center")}
+        specs = {
+            "header": header,
+            "R": {"fill": self.fill_r},
+            "E": {"fill": self.fill_e},
+            "over": {"fill": self.fill_over},
+        }
+        protos = {}
+        for key, attrs in specs.items():
+            c = WriteOnlyCell(ws)
+            for k, v in attrs.items():
+                setattr(c, k, v)
+            protos[key] = c._style
+        return protos
+
+    def _cell(self, ws, value, style):
+        c = WriteOnlyCell(ws, value=value)
+        c._style = copy(style)
+        return c
+
+    def _stream_prepare(self, ws, widths):
+        # write_only: dimensi kolom & freeze harus diset sebelum baris pertama
+        ws.freeze_panes = "A2"
+        widths.apply(ws)
+
+    def _stream_sheet(self, wb, protos, title, header, rows):
+        ws = wb.create_sheet(title)
+        self._stream_begin(ws, protos, header, rows)
+        for r in rows:
+            ws.append(r)
+        return ws
+
+    def _stream_begin(self, ws, protos, header, rows):
+        """Lebar kolom dari header + rows (contoh), lalu tulis header."""
+        widths = self._widths()
+        for r in [header] + list(rows):
+            widths.update(r)
+        self._stream_prepare(ws, widths)
+        ws.append([self._cell(ws, h, protos["header"]) for h in header])
+
+    def _stream_begin_jadwal(self, ws, protos, headers, meta):
+        widths = self._widths()
+        widths.update(headers)
+        widths.update_frame(meta, headers)
+        self._stream_prepare(ws, widths)
+        ws.append([self._cell(ws, h, protos["header"]) for h in headers])
+
+    def _stream_jadwal_rows(self, ws, protos, meta, codes):
+        if self.use_rules:
+            # nilai polos, warna dari aturan conditional formatting
+            text = np.array([None, "R", "E", "E"], dtype=object)[codes]
+            for m, row_text in zip(meta.itertuples(index=False, name=None), text):
+                ws.append(list(m) + list(row_text))
+            return
+        marks = {1: ("R", protos["R"]), 2: ("E", protos["E"]), 3: ("E", protos["over"])}
+        for m, row_codes in zip(meta.itertuples(index=False, name=None), codes):
+            ws.append(list(m) + [self._cell(ws, *marks[c]) if c else "" for c in row_codes])
+
+    def _stream_source_sheets(self, wb, source_file, skip=()):
+        if isinstance(source_file, ParsedWorkbook) and not source_file.is_excel:
+            # input CSV / Parquet: sheet sumber dibangun dari tabelnya
+            src = source_file.open_workbook()
+        elif isinstance(source_file, ParsedWorkbook):
+            src = load_workbook(source_file.buffer(), read_only=True)
+        else:
+            if hasattr(source_file, "seek"):
+                source_file.seek(0)
+            src = load_workbook(source_file, read_only=True)
+
+        protos = None
+        for sws in src.worksheets:
+            if sws.title in skip:
+                continue
+            ws = wb.create_sheet(sws.title)
+            ws.freeze_panes = "A2"
+            protos = protos or self._stream_protos(ws)
+            for i, row in enumerate(sws.iter_rows(values_only=True)):
+                if i == 0:
+                    row = [self._cell(ws, v, protos["header"]) for v in row]
+                ws.append(row)
+        src.close()
+
+    def _slot_codes(self, df, slot_str, carry=None):
+        """
+        0 kosong, 1 R, 2 E, 3 E melewati max_poleks_per_slot (urut baris per hari).
+        carry: {hari: hitungan E per slot} dari potongan sebelumnya (mode chunk),
+        diperbarui di tempat.
+        """
+        mat = as_matrix(df, slot_str)
+        is_r = mat.mask(REG)
+        is_e = mat.mask(POLEKS)
+        hari = mat.meta["HARI"].codes
+        if len(mat):
+            # hari kosong (kode -1) tidak pernah dihitung lewat batas
+            cum = pd.DataFrame(is_e).groupby(hari).cumsum().to_numpy()
+            cum[hari < 0] = 0
+            if carry is not None:
+                cum = self._carry_counts(mat.meta["HARI"], cum, carry)
+        else:
+            cum = np.zeros(is_e.shape, dtype=int)
+        over = is_e & (cum > self.config.max_poleks_per_slot)
+        return np.select([is_r, over, is_e], [1, 3, 2], 0).astype(np.int8)
+
+    @staticmethod
+    def _carry_counts(hari_cat, cum, carry):
+        n_slots = cum.shape[1]
+        labels = list(hari_cat.categories)
+        base = np.stack([carry.get(h, np.zeros(n_slots, dtype=np.int64)) for h in labels]
+                        + [np.zeros(n_slots, dtype=np.int64)])
+        cum = cum + base[hari_cat.codes]      # kode -1 -> baris nol terakhir
+        cum[hari_cat.codes < 0] = 0
+        for i, h in enumerate(labels):
+            rows = np.flatnonzero(hari_cat.codes == i)
+            if len(rows):
+                carry[h] = cum[rows[-1]].astype(np.int64)
+        return cum
 
-            for idx, slot in enumerate(slot_str):
-                v = rec.get(slot, "")
-                col_idx = 5 + idx
-                cell = ws.cell(row=row_idx, column=col_idx)
+    # ======================================================================
+    # Pewarnaan slot (tanpa border antar hari)
+    # ======================================================================
+    def apply_styles(self, ws, df, slot_str):
+        codes = self._slot_codes(df, slot_str)
+        fills = {1: self.fill_r, 2: self.fill_e, 3: self.fill_over}
 
-                if v == "R":
-                    cell.fill = self.fill_r
-                elif v == "E":
-                    counter[hari][slot] += 1
-                    if counter[hari][slot] > self.config.max_poleks_per_slot:
-                        cell.fill = self.fill_over
-                    else:
-                        cell.fill = self.fill_e
+        # hanya sel terisi yang disentuh (sel kosong tidak diberi fill)
+        for r, c in zip(*np.nonzero(codes)):
+            ws.cell(row=int(r) + 2, column=int(c) + 5).fill = fills[codes[r, c]]
 
-            row_idx += 1
+    # ======================================================================
+    # Pewarnaan slot berbasis aturan (conditional formatting)
+    # ======================================================================
+    def apply_style_rules(self, ws, df, slot_str):
+        self._slot_rules(ws, self._slot_codes(df, slot_str))
+
+    def _slot_rules(self, ws, codes):
+        n_rows, n_slots = codes.shape
+        if not n_rows or not n_slots:
+            return
+        self._over_rules(ws, codes)
+        self._base_rules(ws, n_rows, n_slots)
+
+    def _over_rules(self, ws, codes, offset=0):
+        """offset: jumlah baris data sebelum codes (mode chunk)."""
+        n_rows, n_slots = codes.shape
+
+        # sel poleks yang melewati batas, prioritas tertinggi. Aturannya "= E",
+        # jadi range boleh melewati sel non-E: gabung run per kolom yang tidak
+        # memuat E normal dan berisi minimal satu sel lewat batas.
+        over = (codes == 3).T
+        col, a, b = runs((codes != 2).T)
+        cum = np.concatenate([np.zeros((n_slots, 1), dtype=np.int64), over.cumsum(axis=1)], axis=1)
+        keep = cum[col, b] > cum[col, a]
+        if keep.any():
+            sqref = " ".join(f"{get_column_letter(5 + c)}{s + offset + 2}:"
+                             f"{get_column_letter(5 + c)}{e + offset + 1}"
+                             for c, s, e in zip(col[keep], a[keep], b[keep]))
+            ws.conditional_formatting.add(sqref, CellIsRule(operator="equal", formula=['"E"'],
+                                                            fill=self.fill_over, stopIfTrue=True))
+
+    def _base_rules(self, ws, n_rows, n_slots):
+        if not n_rows or not n_slots:
+            return
+        area = f"E2:{get_column_letter(4 + n_slots)}{n_rows + 1}"
+
+        ws.conditional_formatting.add(area, CellIsRule(operator="equal", formula=['"R"'],
+                                                       fill=self.fill_r))
+        ws.conditional_formatting.add(area, CellIsRule(operator="equal", formula=['"E"'],
+                                                       fill=self.fill_e))
 
     # ======================================================================
     # Styling Premium
     # ======================================================================
-    def _auto_width_all_sheets(self, wb):
-        for ws in wb.worksheets:
-            for col in ws.columns:
-                max_len = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-                ws.column_dimensions[col[0].column_letter].width = max_len + 2
+    def _register_header_style(self, wb):
+        if self.header_style.name not in wb.named_styles:
+            wb.add_named_style(copy(self.header_style))
+        return self.header_style.name
 
     def _style_headers_all(self, wb):
+        if self.use_rules:
+            name = self._register_header_style(wb)
+            for ws in wb.worksheets:
+                for c in ws[1]:
+                    c.style = name
+            return
+
         for ws in wb.worksheets:
             for c in ws[1]:
                 c.font = Font(bold=True)
@@ -308,23 +734,41 @@ class ExcelWriter:
         for ws in wb.worksheets:
             ws.freeze_panes = "A2"
 
+    # ======================================================================
+    # Diagnostik input (tab Error Analyzer) -> workbook satu sheet
+    # ======================================================================
+    def write_issues(self, issues, title="Diagnostik"):
+        wb = Workbook()
+        wb.remove(wb.active)
+        self._sheet_from_rows(wb, title, list(issues.columns),
+                              issues.itertuples(index=False, name=None))
+        self._style_headers_all(wb)
+        self._freeze_headers_all(wb)
+
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        return buf
+
     # ======================================================================
     # TEMPLATE GENERATOR — fitur baru
     # ======================================================================
-    def generate_template(self, slot_str):
+    def generate_template(self):
+        """Template input: layout sama dengan yang dibaca Scheduler & Validator."""
         wb = Workbook()
 
         ws1 = wb.active
         ws1.title = "Reguler"
         ws2 = wb.create_sheet("Poleks")
 
-        headers = ["POLI ASAL", "JENIS POLI", "HARI", "DOKTER"] + slot_str
+        hari = self.config.hari_list
+        headers = ["Nama Dokter", "Poli Asal", "Jenis Poli"] + hari
         ws1.append(headers)
         ws2.append(headers)
 
-        # Contoh baris
-        ws1.append(["Poli Anak", "Reguler", "Senin", "dr. Contoh"] + [""] * len(slot_str))
-        ws2.append(["Poli Anak", "Poleks", "Senin", "dr. Contoh"] + [""] * len(slot_str))
+        # Contoh baris (sel hari: satu / beberapa range "08.00-12.00")
+        ws1.append(["dr. Contoh", "Poli Anak", "Reguler", "08.00-12.00"] + [""] * (len(hari) - 1))
+        ws2.append(["dr. Contoh", "Poli Anak", "Poleks", "13.00-15.00"] + [""] * (len(hari) - 1))
 
         buf = io.BytesIO()
         wb.save(buf)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+
+def ngroup(df, keys):
+    """groupby(keys).ngroup() sebagai int64; kunci NaN (ngroup -> NaN) menjadi -1."""
+    return df.groupby(keys).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+
+
+def group_codes(df, keys):
+    """
+    (tabel kunci unik terurut, kode grup per baris) — urutan sama dengan groupby.
+    Baris dengan kunci kosong (NaN) mendapat kode -1.
+    """
+    codes = ngroup(df, keys)
+    first = pd.Series(np.arange(len(codes))).groupby(codes).first()
+    first = first[first.index >= 0]
+    return df[keys].iloc[first.to_numpy()].reset_index(drop=True), codes
+
+
+def group_reduce(codes, mat, n, ufunc):
+    """Reduksi baris `mat` per kode grup (0..n-1) dengan ufunc.reduceat."""
+    out = np.zeros((n,) + mat.shape[1:], dtype=mat.dtype)
+    keep = codes >= 0
+    codes, mat = codes[keep], mat[keep]
+    if len(codes) == 0:
+        return out
+    order = np.argsort(codes, kind="stable")
+    uniq, first = np.unique(codes[order], return_index=True)
+    out[uniq] = ufunc.reduceat(mat[order], first, axis=0)
+    return out
+
+
+def runs(mask):
+    """Run-length encoding sepanjang sumbu slot -> (baris, slot awal, slot akhir eksklusif)."""
+    n = mask.shape[0]
+    padded = np.zeros((n, mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    d = np.diff(padded, axis=1)
+    row, start = np.nonzero(d == 1)
+    _, end = np.nonzero(d == -1)
+    return row, start, end
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from .aggregator import RecapAggregator
+from .cleaner import DataCleaner
+from .schedule_matrix import ScheduleMatrix
+from app.config import PROCESS_FIELDS
+from app.utils.profiler import profiler
+
+
+KEYS = ["Nama Dokter", "Poli Asal"]
+
+
+class IncrementalScheduler:
+    """
+    Jadwal yang bisa diedit per baris input. Edit hanya menjadwalkan ulang
+    grup (Nama Dokter, Poli Asal) yang tersentuh; matriks jadwal & agregat
+    rekap ditambal (bagian lama dibuang, bagian baru disisipkan) tanpa
+    memproses ulang seluruh workbook.
+    """
+
+    SHEETS = ("Reguler", "Poleks")
+
+    def __init__(self, scheduler, df_reg, df_pol, mat=None):
+        self.scheduler = scheduler
+        self.config = scheduler.config
+        self.aggregator = RecapAggregator(self.config)
+        self.grid = scheduler.grid()
+        self.fix_report = {}
+        self.revision = 0
+        # config dibagi dengan sidebar -> sidik saat dibuat, untuk deteksi basi
+        self._fingerprint = self.config.fingerprint(PROCESS_FIELDS)
+
+        # input bersih per sheet (index 0..n-1, dipakai juga oleh editor UI)
+        self.frames = {}
+        for df, jenis in ((df_reg, "Reguler"), (df_pol, "Poleks")):
+            if not df.empty:
+                df, self.fix_report[jenis] = DataCleaner.clean_block(
+                    df, self.config.hari_list, jenis, self.config.auto_fix_errors)
+            self.frames[jenis] = df.reset_index(drop=True)
+
+        # matriks per sheet; hasil Scheduler dipakai ulang bila ada
+        if mat is None:
+            self.blocks = {j: scheduler._schedule_block(f, j) for j, f in self.frames.items()}
+        else:
+            jenis = mat.column("JENIS POLI")
+            self.blocks = {j: mat.take(jenis == j) for j in self.SHEETS}
+        self.matrix = ScheduleMatrix.concat([self.blocks[j] for j in self.SHEETS], self.grid)
+        self._agg = None
+
+    @property
+    def stale(self):
+        """True bila opsi proses (jam mulai, interval, hari, ...) sudah berubah."""
+        return self.config.fingerprint(PROCESS_FIELDS) != self._fingerprint
+
+    @property
+    def aggregates(self):
+        """RecapAggregates jadwal saat ini (build penuh sekali, lalu ditambal)."""
+        if self._agg is None:
+            self._agg = self.aggregator.build(self.matrix, self.matrix.slot_str)
+        return self._agg
+
+    # ======================================================================
+    # Edit
+    # ======================================================================
+    def apply_edit(self, jenis, edited):
+        """
+        Terapkan frame hasil edit untuk satu sheet. Hasil: jumlah grup
+        dokter-poli yang dijadwalkan ulang (0 = tidak ada perubahan).
+        """
+        old = self.frames[jenis]
+        edited = edited.reindex(columns=old.columns.union(edited.columns, sort=False))
+
+        with profiler.stage("edit.diff", jenis=jenis, rows=len(edited)):
+            groups = self.changed_groups(old, edited)
+        if not groups:
+            return 0
+
+        hit = _in_groups(edited, KEYS, groups)
+        new, fixed = DataCleaner.clean_block(edited[hit], self.config.hari_list, jenis,
+                                             self.config.auto_fix_errors)
+        self.fix_report[jenis] = self.fix_report.get(jenis, 0) + fixed
+        self.frames[jenis] = pd.concat([edited[~hit], new]).sort_index().reset_index(drop=True)
+
+        block = self.blocks[jenis]
+        # kandidat lewat kategori dokter dulu, pasangan dokter-poli dicek di situ saja
+        gone = block.isin("DOKTER", {d for d, _ in groups})
+        cand = np.flatnonzero(gone)
+        gone[cand] = _in_groups(block.meta_frame(cand), ["DOKTER", "POLI ASAL"], groups)
+        removed = block.take(gone)
+        with profiler.stage("edit.schedule", jenis=jenis, groups=len(groups), rows=len(new)):
+            added = self.scheduler._schedule_block(new, jenis)
+        self.blocks[jenis] = self._sorted(
+            ScheduleMatrix.concat([block.take(~gone), added], self.grid))
+        self.matrix = ScheduleMatrix.concat([self.blocks[j] for j in self.SHEETS], self.grid)
+
+        if self._agg is not None:
+            with profiler.stage("edit.aggregate", groups=len(groups)):
+                self._agg = self.aggregator.update(
+                    self._agg, self.matrix, removed, added,
+                    {d for d, _ in groups}, {p for _, p in groups})
+
+        self.revision += 1
+        return len(groups)
+
+    def changed_groups(self, old, new):
+        """Set (dokter, poli) dari baris yang berubah, dihapus, atau ditambah."""
+        cols = [c for c in KEYS + self.config.hari_list if c in old.columns]
+        a = old[cols].astype(object).where(old[cols].notna(), "")
+        b = new.reindex(columns=cols).astype(object)
+        b = b.where(b.notna(), "")
+
+        common = a.index.intersection(b.index)
+        diff = (a.loc[common].astype(str) != b.loc[common].astype(str)).any(axis=1)
+        changed = common[diff.to_numpy()]
+
+        groups = set()
+        for frame, rows in ((a, changed.union(a.index.difference(b.index))),
+                            (b, changed.union(b.index.difference(a.index)))):
+            keys = frame.loc[rows, KEYS]
+            groups.update(zip(keys["Nama Dokter"], keys["Poli Asal"]))
+        return {g for g in groups if all(v != "" for v in g)}
+
+    def _sorted(self, mat):
+        """Urutan baris seperti Scheduler: dokter, poli (terurut), lalu urutan hari."""
+        if mat.empty:
+            return mat
+        order = np.lexsort((_hari_rank(mat.meta["HARI"], self.config.hari_list),
+                            _rank(mat.meta["POLI ASAL"]), _rank(mat.meta["DOKTER"])))
+        return mat.take(order)
+
+
+def _in_groups(df, cols, groups):
+    """Mask baris yang pasangan kolom `cols`-nya ada di `groups`."""
+    if df.empty or not groups:
+        return np.zeros(len(df), dtype=bool)
+    return pd.MultiIndex.from_frame(df[cols]).isin(list(groups))
+
+
+def _rank(cat):
+    rank = np.argsort(np.argsort(np.asarray(cat.categories, dtype=object), kind="stable"))
+    return np.where(cat.codes >= 0, rank[cat.codes], -1)
+
+
+def _hari_rank(cat, hari_list):
+    pos = pd.Index(hari_list).get_indexer(cat.categories)
+    return np.where(cat.codes >= 0, pos[cat.codes], -1)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from .occupancy import OccupancyEngine, META_COLUMNS
+from .schedule_matrix import ScheduleMatrix, REG, POLEKS
+
+
+class IntervalTable:
+    """
+    Produk antara yang tidak bergantung grid slot: interval praktik yang
+    sudah di-merge per baris jadwal (dokter, poli, hari) satu sheet.
+    Ganti interval / jam mulai cukup project() ulang, tanpa clean & parse.
+    """
+
+    def __init__(self, jenis, meta, row, start, end):
+        self.jenis = jenis
+        self.meta = meta      # {kolom: pd.Categorical}, satu baris per (dokter, poli, hari)
+        self.row = row        # int64 per interval -> baris meta
+        self.start = start    # int32 menit sejak 00:00
+        self.end = end
+
+    @classmethod
+    def empty(cls, jenis):
+        return cls(jenis, {c: pd.Categorical([]) for c in META_COLUMNS},
+                   np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                   np.zeros(0, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.meta["HARI"])
+
+    @property
+    def nbytes(self):
+        return (self.row.nbytes + self.start.nbytes + self.end.nbytes +
+                sum(c.codes.nbytes for c in self.meta.values()))
+
+    def project(self, grid, slot_start, slot_end):
+        """Interval -> ScheduleMatrix di grid tsb (satu baris per baris meta)."""
+        if not len(self):
+            return ScheduleMatrix.blank(grid)
+        occ = OccupancyEngine.occupancy(self.row, self.start, self.end, len(self),
+                                        slot_start, slot_end)
+        mark = REG if self.jenis == "Reguler" else POLEKS
+        return ScheduleMatrix(grid, (occ * mark).astype(np.int8), self.meta)
+
+
+def merge_intervals(owner, start, end):
+    """
+    Versi vektor Scheduler.merge_ranges untuk banyak owner sekaligus:
+    interval yang beririsan/bersambung dalam owner yang sama digabung.
+    Interval terbalik (end <= start) dibiarkan apa adanya.
+    Hasil: (owner, start, end) terurut per owner lalu start.
+    """
+    owner, start, end = np.asarray(owner), np.asarray(start), np.asarray(end)
+    valid = end > start
+    o, s, e = owner[valid], start[valid], end[valid]
+
+    order = np.lexsort((s, o))
+    o, s, e = o[order], s[order], e[order]
+    if len(o):
+        reach = pd.Series(e).groupby(o).cummax().to_numpy()
+        new = np.ones(len(o), dtype=bool)
+        new[1:] = (o[1:] != o[:-1]) | (s[1:] > reach[:-1])
+        first = np.flatnonzero(new)
+        o, s, e = o[first], s[first], np.maximum.reduceat(e, first)
+
+    o = np.concatenate([o, owner[~valid]])
+    s = np.concatenate([s, start[~valid]])
+    e = np.concatenate([e, end[~valid]])
+    order = np.lexsort((s, o))
+    return o[order], s[order], e[order]
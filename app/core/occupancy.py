@@ -0,0 +1,50 @@
+import numpy as np
+
+
+META_COLUMNS = ["POLI ASAL", "JENIS POLI", "HARI", "DOKTER"]
+
+
+class OccupancyEngine:
+    """Hitung matriks okupansi dokter×hari×slot sekaligus dengan NumPy."""
+
+    def __init__(self, config):
+        self.config = config
+
+    # ======================================================================
+    # Grid slot -> array menit
+    # ======================================================================
+    def slot_bounds(self, slots):
+        """Awal & akhir setiap slot (menit sejak 00:00), sama dengan grid generate_slots."""
+        start = np.array([t.hour * 60 + t.minute for t in slots], dtype=np.int32)
+        end = (start + self.config.interval_minutes) % (24 * 60)
+        return start, end
+
+    @staticmethod
+    def to_minutes(t):
+        return t.hour * 60 + t.minute
+
+    # ======================================================================
+    # Overlap batch
+    # ======================================================================
+    @staticmethod
+    def occupancy(owner, starts, ends, n_owner, slot_start, slot_end):
+        """
+        owner/starts/ends: array sejajar, satu elemen per interval.
+        Hasil: bool (n_owner, n_slot) — True bila slot beririsan dengan
+        salah satu interval milik owner tsb.
+        """
+        occ = np.zeros((n_owner, len(slot_start)), dtype=bool)
+        if len(owner) == 0:
+            return occ
+
+        starts = np.asarray(starts)[:, None]
+        ends = np.asarray(ends)[:, None]
+        hit = (slot_end[None, :] > starts) & (slot_start[None, :] < ends)
+
+        # kumpulkan hit per owner (setara any() atas range yang sudah di-merge)
+        order = np.argsort(owner, kind="stable")
+        owner_sorted = np.asarray(owner)[order]
+        uniq, first = np.unique(owner_sorted, return_index=True)
+        occ[uniq] = np.logical_or.reduceat(hit[order], first, axis=0)
+        return occ
+
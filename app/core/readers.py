@@ -0,0 +1,251 @@
+"""
+Backend pembaca sheet input. Semua backend menghasilkan DataFrame setara
+pd.read_excel (header di baris 1, baris kosong di akhir dibuang, sel kosong NaN).
+Index frame = nomor baris asli di file (SOURCE_ROW; header = baris 1), jadi
+diagnostik tetap menunjuk baris yang benar walau baris dipecah / dibuang.
+
+    auto     -> calamine bila terpasang, selain itu openpyxl streaming
+    calamine -> pd.read_excel(engine="calamine"), butuh paket python-calamine
+    openpyxl -> load_workbook(read_only=True, data_only=True) + iter_rows
+    pandas   -> pd.ExcelFile dari bytes + pd.read_excel (perilaku lama)
+
+Input CSV / Parquet (satu tabel, layout kolom sama) dibaca lewat TableSource:
+baris dipecah ke sheet Reguler / Poleks menurut kolom "Jenis Poli".
+"""
+import importlib.util
+import io
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+
+BACKENDS = ("auto", "calamine", "openpyxl", "pandas")
+FORMATS = ("xlsx", "csv", "parquet")
+SHEETS = ("Reguler", "Poleks")
+
+# pemisah kolom CSV yang dikenali (dipilih dari baris header)
+CSV_SEPARATORS = (",", ";", "\t", "|")
+
+# nama index frame sheet: nomor baris asli di file
+SOURCE_ROW = "BARIS"
+
+
+def with_source_rows(df, first=2):
+    """Index = nomor baris asli berurutan (baris data pertama = `first`)."""
+    df.index = pd.RangeIndex(first, first + len(df), name=SOURCE_ROW)
+    return df
+
+
+def calamine_available():
+    return importlib.util.find_spec("python_calamine") is not None
+
+
+def parquet_available():
+    return any(importlib.util.find_spec(m) is not None for m in ("pyarrow", "fastparquet"))
+
+
+def detect_format(data, name=None):
+    """Format input dari magic bytes, lalu ekstensi nama file; sisanya dianggap CSV."""
+    if data[:4] == b"PAR1":
+        return "parquet"
+    if data[:4] == b"PK\x03\x04":
+        return "xlsx"
+    ext = os.path.splitext(name or "")[1].lower()
+    if ext == ".parquet":
+        return "parquet"
+    if ext in (".xlsx", ".xlsm"):
+        return "xlsx"
+    return "csv"
+
+
+def available_backends():
+    """Backend yang bisa dipakai di lingkungan ini (tanpa "auto")."""
+    return [b for b in BACKENDS[1:] if b != "calamine" or calamine_available()]
+
+
+def rows_to_frame(rows):
+    """
+    Baris values_only (header dulu) -> DataFrame: tiap kolom dikumpulkan jadi
+    satu array lalu diberi dtype sekali (int/float/datetime/object).
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return with_source_rows(pd.DataFrame())
+
+    # baris kosong di tengah tetap (nomor baris Excel terjaga), di ujung dibuang
+    body = list(rows)
+    while body and not _used_width(body[-1]):
+        body.pop()
+    width = max([_used_width(header)] + [_used_width(r) for r in body])
+    if not width:
+        return with_source_rows(pd.DataFrame())
+
+    columns = _column_names(list(header[:width]) + [None] * (width - len(header)))
+    if not body:
+        return with_source_rows(pd.DataFrame(columns=columns))
+
+    values = np.full((len(body), width), None, dtype=object)
+    for i, r in enumerate(body):
+        n = min(len(r), width)
+        values[i, :n] = r[:n]
+    values[values == ""] = None
+
+    return with_source_rows(pd.DataFrame({c: _typed(values[:, i]) for i, c in enumerate(columns)},
+                                         columns=pd.Index(columns, dtype=object)))
+
+
+def _used_width(row):
+    for i in range(len(row) - 1, -1, -1):
+        if row[i] is not None and row[i] != "":
+            return i + 1
+    return 0
+
+
+def _column_names(header):
+    # sama dengan pd.read_excel: kosong -> "Unnamed: i", duplikat -> "nama.1"
+    names, seen = [], {}
+    for i, h in enumerate(header):
+        name = f"Unnamed: {i}" if h is None or h == "" else h
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _typed(col):
+    s = pd.Series(col, dtype=object)
+    s[s.isna()] = np.nan
+    return s.infer_objects()
+
+
+# ======================================================================
+# Sumber (satu workbook terbuka per file)
+# ======================================================================
+class OpenpyxlSource:
+    name = "openpyxl"
+
+    def __init__(self, buffer):
+        self._wb = load_workbook(buffer, read_only=True, data_only=True)
+        self.sheet_names = list(self._wb.sheetnames)
+
+    def read(self, sheet):
+        return rows_to_frame(self._wb[sheet].iter_rows(values_only=True))
+
+
+class CalamineSource:
+    name = "calamine"
+
+    def __init__(self, buffer):
+        from python_calamine import CalamineWorkbook
+
+        self._data = buffer.getvalue()
+        self.sheet_names = list(CalamineWorkbook.from_filelike(io.BytesIO(self._data)).sheet_names)
+
+    def read(self, sheet):
+        return with_source_rows(pd.read_excel(io.BytesIO(self._data), sheet_name=sheet,
+                                              engine="calamine"))
+
+
+class PandasSource:
+    """pd.read_excel dari bytes (nilai sel, bukan teks formula) — cadangan bila backend lain gagal."""
+    name = "pandas"
+
+    def __init__(self, buffer):
+        self._xls = pd.ExcelFile(buffer, engine="openpyxl")
+        self.sheet_names = list(self._xls.sheet_names)
+
+    def read(self, sheet):
+        return with_source_rows(self._xls.parse(sheet))
+
+
+def open_source(buffer, backend="auto"):
+    """
+    Buka sumber sesuai backend. "auto": calamine bila terpasang, lalu openpyxl
+    streaming; backend yang gagal dibuka dilewati ke kandidat berikutnya
+    (error terakhir diteruskan bila semua gagal).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend pembaca tidak dikenal: {backend}")
+    if backend == "pandas":
+        return PandasSource(buffer)
+
+    if backend == "auto":
+        candidates = [CalamineSource, OpenpyxlSource] if calamine_available() else [OpenpyxlSource]
+    else:
+        candidates = [CalamineSource if backend == "calamine" else OpenpyxlSource]
+
+    for i, cls in enumerate(candidates):
+        buffer.seek(0)
+        try:
+            return cls(buffer)
+        except Exception:
+            if i == len(candidates) - 1:
+                raise
+
+
+# ======================================================================
+# CSV / Parquet (satu tabel) -> sheet Reguler & Poleks
+# ======================================================================
+def split_sheets(df):
+    """
+    Tabel gabungan -> {sheet: DataFrame}. "Jenis Poli" = Poleks (tanpa beda
+    huruf besar/kecil) masuk sheet Poleks, sisanya (termasuk kosong) Reguler.
+    Kedua sheet selalu ada dengan kolom yang sama.
+    """
+    poleks = np.zeros(len(df), dtype=bool)
+    if "Jenis Poli" in df.columns:
+        jenis = df["Jenis Poli"].astype("string").str.strip().str.casefold()
+        poleks = (jenis == "poleks").fillna(False).to_numpy(dtype=bool)
+    # index (nomor baris asli) ikut terbawa ke potongan sheet
+    return {"Reguler": df[~poleks], "Poleks": df[poleks]}
+
+
+def _csv_separator(head):
+    line = head.decode("utf-8", errors="ignore").split("\n", 1)[0]
+    sep = max(CSV_SEPARATORS, key=line.count)
+    return sep if line.count(sep) else ","
+
+
+def read_csv(buffer):
+    """
+    Baris kosong di tengah dipertahankan (NaN) supaya index = nomor baris
+    file; baris kosong di akhir dibuang seperti pembaca Excel.
+    """
+    sep = _csv_separator(buffer.read(64 * 1024))
+    for encoding in ("utf-8-sig", "latin-1"):
+        buffer.seek(0)
+        try:
+            df = pd.read_csv(buffer, sep=sep, encoding=encoding, skip_blank_lines=False)
+        except UnicodeDecodeError:
+            continue
+        used = np.flatnonzero(df.notna().any(axis=1).to_numpy())
+        df = df.iloc[:used[-1] + 1 if len(used) else 0]
+        return with_source_rows(df)
+
+
+class TableSource:
+    """Input CSV / Parquet: dibaca utuh sekali, read() hanya mengambil potongan sheet."""
+
+    def __init__(self, frame, name):
+        self.name = name
+        self._frames = split_sheets(frame)
+        self.sheet_names = list(SHEETS)
+
+    @classmethod
+    def open(cls, buffer, fmt):
+        if fmt == "csv":
+            return cls(read_csv(buffer), "csv")
+        if fmt == "parquet":
+            if not parquet_available():
+                raise ImportError("Membaca Parquet butuh paket pyarrow atau fastparquet")
+            return cls(with_source_rows(pd.read_parquet(buffer)), "parquet")
+        raise ValueError(f"Format tabel tidak dikenal: {fmt}")
+
+    def read(self, sheet):
+        return self._frames[sheet]
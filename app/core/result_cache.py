@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+import zlib
+
+import numpy as np
+
+from app.config import APP_VERSION, PROCESS_FIELDS, EXPORT_FIELDS
+from .schedule_matrix import ScheduleMatrix
+
+
+class ResultCache:
+    """
+    Cache hasil di disk, content-addressed: kunci = sha256 isi file + sidik
+    Config + APP_VERSION. Jadwal hasil (ScheduleMatrix sebagai .npz: kode slot
+    int8 + kode meta kategorikal) & xlsx disimpan terpisah, jadi
+    ganti opsi ekspor tetap memakai jadwal yang sudah ada.
+
+    Tulis atomik (file sementara + os.replace); eviksi LRU berdasarkan mtime
+    (di-touch setiap hit) sampai total ukuran <= max_mb.
+    """
+
+    def __init__(self, root, max_mb=200):
+        self.root = root
+        self.max_bytes = int(max_mb * 2**20)
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def _key(digest, config, fields):
+        fp = repr((APP_VERSION, config.fingerprint(fields)))
+        return f"{digest}-{hashlib.sha256(fp.encode()).hexdigest()[:16]}"
+
+    def schedule_key(self, digest, config):
+        return self._key(digest, config, PROCESS_FIELDS)
+
+    def export_key(self, digest, config):
+        return self._key(digest, config, PROCESS_FIELDS + EXPORT_FIELDS)
+
+    def _path(self, key, ext):
+        return os.path.join(self.root, key + ext)
+
+    # ======================================================================
+    # Jadwal hasil
+    # ======================================================================
+    def get_schedule(self, key):
+        """(ScheduleMatrix, fix_report) atau None. Entri rusak dibuang (miss)."""
+        path = self._path(key, ".npz")
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                info = json.loads(z["info"].tobytes())
+                arrays = {k: z[k] for k in z.files if k != "info"}
+            mat = ScheduleMatrix.from_arrays(arrays, info)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile, zlib.error):
+            # terpotong / rusak: hapus supaya put_schedule berikutnya menulis ulang
+            self._remove(path)
+            return None
+        self._touch(path)
+        return mat, info["fix_report"]
+
+    def put_schedule(self, key, mat, fix_report=None):
+        arrays, info = mat.to_arrays()
+        info["fix_report"] = fix_report or {}
+        arrays["info"] = np.frombuffer(json.dumps(info, default=str).encode(), dtype=np.uint8)
+        self._write(self._path(key, ".npz"), lambda f: np.savez_compressed(f, **arrays))
+
+    # ======================================================================
+    # File xlsx hasil
+    # ======================================================================
+    def get_export(self, key):
+        path = self._path(key, ".xlsx")
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        self._touch(path)
+        return data
+
+    def put_export(self, key, data):
+        self._write(self._path(key, ".xlsx"), lambda f: f.write(data))
+
+    # ======================================================================
+    # Internal
+    # ======================================================================
+    def _write(self, path, dump):
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                dump(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = []
+        with os.scandir(self.root) as it:
+            for e in it:
+                if e.is_file() and not e.name.startswith(".tmp-"):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,184 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from .grouping import group_reduce
+from .occupancy import OccupancyEngine, META_COLUMNS
+from .schedule_matrix import ScheduleMatrix, as_matrix, EMPTY, REG, POLEKS
+from .time_parser import TimeParser
+
+
+# date.weekday() -> nama hari seperti di Config.hari_order
+WEEKDAY_HARI = ("Senin", "Selasa", "Rabu", "Kamis", "Jum'at", "Sabtu", "Minggu")
+
+LOAD_COLUMNS = ["TANGGAL", "HARI", "DOKTER", "JAM REG", "JAM POLEKS", "TOTAL JAM", "KETERANGAN"]
+
+
+def to_date(value):
+    """date / datetime / Timestamp / string ISO -> datetime.date."""
+    return pd.Timestamp(value).date()
+
+
+class RosterCalendar:
+    """
+    Roster bertanggal dari satu template mingguan (ScheduleMatrix hasil proses)
+    plus pengecualian bertanggal yang jarang:
+      - penutupan rentang tanggal: libur (semua / satu poli) & cuti dokter
+      - sesi tambahan satu tanggal (mis. poli Sabtu sekali jalan)
+    Tanggal tidak pernah diekspansi penuh: satu hari = baris template hari
+    tsb, dikurangi penutupan & ditambah sesi pada tanggal itu saja.
+    """
+
+    def __init__(self, template, slot_str=None, interval=None):
+        self.template = as_matrix(template, slot_str, interval)
+        self.closures = []   # (mulai, selesai, dokter | None, poli | None, ket)
+        self.sessions = {}   # tanggal -> [ScheduleMatrix satu baris]
+
+        mat = self.template
+        hari = mat.meta["HARI"]
+        self._rows = {h: np.flatnonzero(hari.codes == i) for i, h in enumerate(hari.categories)}
+
+        # beban per hari template: dipakai untuk semua tanggal tanpa pengecualian
+        n = len(hari.categories)
+        slots = group_reduce(hari.codes, np.stack([mat.mask(REG).sum(axis=1),
+                                                   mat.mask(POLEKS).sum(axis=1)], axis=1), n, np.add)
+        pairs = pd.DataFrame({"h": hari.codes, "d": mat.meta["DOKTER"].codes}).drop_duplicates()
+        doctors = pairs[(pairs["h"] >= 0) & (pairs["d"] >= 0)]["h"].value_counts()
+        self._load = {h: (int(doctors.get(i, 0)), int(slots[i, 0]), int(slots[i, 1]))
+                      for i, h in enumerate(hari.categories)}
+
+    @property
+    def grid(self):
+        return self.template.grid
+
+    @property
+    def interval(self):
+        return self.grid.interval or (int(np.diff(self.grid.minutes[:2])[0])
+                                      if len(self.grid) > 1 else 60)
+
+    # ======================================================================
+    # Pengecualian bertanggal
+    # ======================================================================
+    def close(self, start, end=None, dokter=None, poli=None, ket=""):
+        """Tutup rentang tanggal (inklusif) untuk semua / satu dokter / satu poli."""
+        start = to_date(start)
+        end = to_date(end) if end is not None else start
+        if end < start:
+            raise ValueError(f"Tanggal selesai {end} sebelum tanggal mulai {start}")
+        self.closures.append((start, end, dokter, poli, ket))
+
+    def add_holiday(self, day, end=None, poli=None, ket="Libur"):
+        self.close(day, end, poli=poli, ket=ket)
+
+    def add_leave(self, dokter, start, end=None, ket="Cuti"):
+        self.close(start, end, dokter=dokter, ket=ket)
+
+    def add_session(self, day, dokter, poli, waktu, jenis="Reguler"):
+        """Sesi satu tanggal; waktu seperti sel input ("08.00-12.00", boleh beberapa range)."""
+        day = to_date(day)
+        ranges = TimeParser().parse_bulk(pd.DataFrame({"WAKTU": [waktu]}))
+        if ranges.empty:
+            raise ValueError(f"Format waktu tidak valid: {waktu}")
+
+        minutes = self.grid.minutes
+        slot_end = (minutes + self.interval) % (24 * 60)
+        occ = OccupancyEngine.occupancy(np.zeros(len(ranges), dtype=np.int64),
+                                        ranges["start"].to_numpy(), ranges["end"].to_numpy(),
+                                        1, minutes, slot_end)
+        if not occ.any():
+            raise ValueError(f"Waktu {waktu} di luar jam slot "
+                             f"({self.grid.labels[0]}–{self.grid.labels[-1]})")
+        mark = REG if jenis == "Reguler" else POLEKS
+        row = ScheduleMatrix.from_values(self.grid, occ * mark, {
+            "POLI ASAL": [poli], "JENIS POLI": [jenis],
+            "HARI": [WEEKDAY_HARI[day.weekday()]], "DOKTER": [dokter]})
+        self.sessions.setdefault(day, []).append(row)
+
+    def clear_exceptions(self):
+        self.closures = []
+        self.sessions = {}
+
+    def _exceptions(self, start, end):
+        """{tanggal: [penutupan]} & tanggal bersesi di [start, end] — hanya tanggal terdampak."""
+        closed = {}
+        for c in self.closures:
+            a, b = max(c[0], start), min(c[1], end)
+            for i in range((b - a).days + 1):
+                closed.setdefault(a + dt.timedelta(days=i), []).append(c)
+        sessions = {d for d in self.sessions if start <= d <= end}
+        return closed, sessions
+
+    # ======================================================================
+    # Roster per tanggal (lazy)
+    # ======================================================================
+    def day(self, day, closures=None):
+        """ScheduleMatrix satu tanggal (closures: penutupan yang berlaku, default dicari)."""
+        day = to_date(day)
+        if closures is None:
+            closures = self._exceptions(day, day)[0].get(day, [])
+
+        rows = self._rows.get(WEEKDAY_HARI[day.weekday()], np.zeros(0, dtype=np.int64))
+        mat = self.template.take(rows)
+        if closures and len(mat):
+            keep = np.ones(len(mat), dtype=bool)
+            for _, _, dokter, poli, _ in closures:
+                hit = np.ones(len(mat), dtype=bool)
+                if dokter is not None:
+                    hit &= mat.isin("DOKTER", [dokter])
+                if poli is not None:
+                    hit &= mat.isin("POLI ASAL", [poli])
+                keep &= ~hit
+            mat = mat.take(keep)
+        return ScheduleMatrix.concat([mat] + self.sessions.get(day, []), self.grid)
+
+    def occurrences(self, start, end):
+        """Generator (tanggal, ScheduleMatrix) untuk tiap tanggal di [start, end]."""
+        start, end = to_date(start), to_date(end)
+        closed, _ = self._exceptions(start, end)
+        for i in range((end - start).days + 1):
+            day = start + dt.timedelta(days=i)
+            yield day, self.day(day, closed.get(day, []))
+
+    def on_duty(self, when):
+        """Siapa yang praktik pada tanggal & jam tsb: POLI ASAL, JENIS POLI, HARI, DOKTER."""
+        when = pd.Timestamp(when)
+        minute = when.hour * 60 + when.minute
+        start = self.grid.minutes
+        slot = np.flatnonzero((start <= minute) & (minute < start + self.interval))
+        mat = self.day(when.date())
+        if not len(slot) or not len(mat):
+            return pd.DataFrame(columns=META_COLUMNS)
+        active = np.flatnonzero(mat.slots[:, slot[0]] != EMPTY)
+        return mat.meta_frame(active)
+
+    def day_load(self, start, end):
+        """
+        Beban per tanggal: jumlah dokter & jam Reguler / Poleks. Tanggal tanpa
+        pengecualian diambil dari beban hari template; hanya tanggal terdampak
+        libur / cuti / sesi yang dihitung ulang.
+        """
+        start, end = to_date(start), to_date(end)
+        dates = pd.date_range(start, end, freq="D")
+        hari = [WEEKDAY_HARI[d] for d in dates.weekday]
+        load = np.array([self._load.get(h, (0, 0, 0)) for h in hari], dtype=np.int64).reshape(-1, 3)
+        ket = [""] * len(dates)
+
+        closed, sessions = self._exceptions(start, end)
+        for day in set(closed) | sessions:
+            i = (day - start).days
+            mat = self.day(day, closed.get(day, []))
+            codes = mat.meta["DOKTER"].codes
+            load[i] = (len(np.unique(codes[codes >= 0])), mat.mask(REG).sum(),
+                       mat.mask(POLEKS).sum())
+            notes = [c[4] or "Tutup" for c in closed.get(day, [])]
+            if day in sessions:
+                notes.append(f"{len(self.sessions[day])} sesi tambahan")
+            ket[i] = ", ".join(notes)
+
+        hours = self.interval / 60
+        out = pd.DataFrame({"TANGGAL": dates.date, "HARI": hari, "DOKTER": load[:, 0],
+                            "JAM REG": load[:, 1] * hours, "JAM POLEKS": load[:, 2] * hours})
+        out["TOTAL JAM"] = out["JAM REG"] + out["JAM POLEKS"]
+        out["KETERANGAN"] = ket
+        return out[LOAD_COLUMNS]
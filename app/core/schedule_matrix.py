@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .occupancy import META_COLUMNS
+
+
+# kode slot
+EMPTY, REG, POLEKS = 0, 1, 2
+SLOT_TEXT = np.array(["", "R", "E"], dtype=object)
+
+
+@dataclass(frozen=True)
+class SlotGrid:
+    """Deskriptor grid slot (label "HH:MM" + interval), dibagi semua matriks se-grid."""
+    labels: tuple
+    interval: int = None
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def make(cls, labels, interval=None):
+        return cls(tuple(labels), interval)
+
+    @classmethod
+    def from_labels(cls, slot_str, interval=None):
+        return cls.make(tuple(slot_str), interval)
+
+    @cached_property
+    def minutes(self):
+        return np.array([int(s[:2]) * 60 + int(s[3:5]) for s in self.labels], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class ScheduleMatrix:
+    """
+    Jadwal hasil dalam bentuk ringkas: matriks int8 baris × slot (0 kosong,
+    1 R, 2 E) + kolom meta kategorikal (POLI ASAL, JENIS POLI, HARI, DOKTER).
+    Frame lebar "R"/"E" hanya dibentuk saat ditampilkan / diekspor (to_frame).
+    """
+
+    def __init__(self, grid, slots, meta):
+        self.grid = grid
+        self.slots = slots   # int8 (n_baris, n_slot)
+        self.meta = meta     # {kolom: pd.Categorical}
+
+    # ======================================================================
+    # Konstruksi
+    # ======================================================================
+    @classmethod
+    def blank(cls, grid):
+        """Matriks tanpa baris (nama "empty" dipakai properti di bawah)."""
+        return cls(grid, np.zeros((0, len(grid)), dtype=np.int8),
+                   {c: pd.Categorical([]) for c in META_COLUMNS})
+
+    @classmethod
+    def from_values(cls, grid, slots, meta_values):
+        """meta_values: {kolom: array nilai per baris}."""
+        meta = {c: pd.Categorical(np.asarray(meta_values[c], dtype=object)) for c in META_COLUMNS}
+        return cls(grid, np.ascontiguousarray(slots, dtype=np.int8), meta)
+
+    @classmethod
+    def from_frame(cls, df, slot_str, interval=None):
+        """Dari frame lebar lama (kolom meta + kolom slot "R"/"E"/"")."""
+        grid = SlotGrid.from_labels(slot_str, interval)
+        if df is None or df.empty:
+            return cls.blank(grid)
+        vals = df.reindex(columns=list(grid.labels), fill_value="").to_numpy(dtype=object)
+        slots = (vals == "R") * REG + (vals == "E") * POLEKS
+        meta = df.reindex(columns=META_COLUMNS, fill_value="")
+        return cls.from_values(grid, slots, {c: meta[c].to_numpy() for c in META_COLUMNS})
+
+    @classmethod
+    def concat(cls, mats, grid=None):
+        mats = [m for m in mats if len(m)]
+        if not mats:
+            return cls.blank(grid)
+        if len(mats) == 1:
+            return mats[0]
+        meta = {c: union_categoricals([m.meta[c] for m in mats]) for c in META_COLUMNS}
+        return cls(mats[0].grid, np.concatenate([m.slots for m in mats]), meta)
+
+    # ======================================================================
+    # Akses
+    # ======================================================================
+    def __len__(self):
+        return len(self.slots)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def slot_str(self):
+        return list(self.grid.labels)
+
+    @property
+    def nbytes(self):
+        return self.slots.nbytes + sum(c.codes.nbytes for c in self.meta.values())
+
+    def mask(self, code):
+        return self.slots == code
+
+    def column(self, name, rows=None):
+        """Nilai meta satu kolom (object array), NaN untuk kode -1."""
+        cat = self.meta[name]
+        codes = cat.codes if rows is None else cat.codes[rows]
+        values = np.append(np.asarray(cat.categories, dtype=object), np.nan)
+        return values[codes]
+
+    def isin(self, name, values):
+        """Mask baris yang nilai meta `name`-nya ada di `values` (cek per kategori)."""
+        cat = self.meta[name]
+        return np.append(cat.categories.isin(list(values)), False)[cat.codes]
+
+    def meta_frame(self, rows=None):
+        return pd.DataFrame({c: self.column(c, rows) for c in META_COLUMNS})
+
+    def take(self, rows):
+        """Subset baris (indeks / mask), kategori tetap."""
+        return ScheduleMatrix(self.grid, self.slots[rows],
+                              {c: cat[rows] for c, cat in self.meta.items()})
+
+    def to_frame(self, rows=None):
+        """Frame lebar seperti output Scheduler lama (materialisasi penuh)."""
+        if self.empty:
+            return pd.DataFrame()
+        slots = self.slots if rows is None else self.slots[rows]
+        out = pd.DataFrame(SLOT_TEXT[slots], columns=self.slot_str)
+        return pd.concat([self.meta_frame(rows), out], axis=1)
+
+    # ======================================================================
+    # Serialisasi ringkas (cache disk): hanya array numerik + kategori
+    # ======================================================================
+    def to_arrays(self):
+        arrays = {"slots": self.slots}
+        categories = {}
+        for i, c in enumerate(META_COLUMNS):
+            arrays[f"meta{i}"] = self.meta[c].codes
+            categories[c] = [v.item() if hasattr(v, "item") else v
+                             for v in self.meta[c].categories]
+        return arrays, {"labels": self.slot_str, "interval": self.grid.interval,
+                        "categories": categories}
+
+    @classmethod
+    def from_arrays(cls, arrays, info):
+        grid = SlotGrid.from_labels(info["labels"], info["interval"])
+        meta = {c: pd.Categorical.from_codes(arrays[f"meta{i}"],
+                                             pd.Index(info["categories"][c], dtype=object))
+                for i, c in enumerate(META_COLUMNS)}
+        return cls(grid, arrays["slots"].astype(np.int8), meta)
+
+
+def as_matrix(data, slot_str=None, interval=None):
+    """ScheduleMatrix apa adanya, atau konversi dari frame lebar lama."""
+    if isinstance(data, ScheduleMatrix):
+        return data
+    return ScheduleMatrix.from_frame(data, slot_str, interval)
@@ -1,7 +1,15 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from .time_parser import TimeParser
 from .cleaner import DataCleaner
+from .occupancy import OccupancyEngine
+from .grouping import ngroup
+from .intervals import IntervalTable, merge_intervals
+from .schedule_matrix import ScheduleMatrix, SlotGrid
+from app.utils.helpers import chunk_list
+from app.utils.parallel import run_calls, split_codes
+from app.utils.profiler import profiler
 
 
 class Scheduler:
@@ -9,6 +17,9 @@ class Scheduler:
     def __init__(self, config):
         self.config = config
         self.tp = TimeParser()
+        self.engine = OccupancyEngine(config)
+        # jumlah sel yang diperbaiki auto-fix per jenis (audit)
+        self.fix_report = {}
 
     def generate_slots(self):
         slots = []
@@ -24,54 +35,151 @@ class Scheduler:
 
         return slots
 
-    # FINAL API METHOD
-    def process_schedule(self, df, jenis):
-        df = DataCleaner.clean(df, self.config.hari_list, jenis, self.config.auto_fix_errors)
+    def slot_labels(self):
+        return [t.strftime("%H:%M") for t in self.generate_slots()]
+
+    def grid(self):
+        return SlotGrid.from_labels(self.slot_labels(), self.config.interval_minutes)
+
+    def process_sheets(self, df_reg, df_pol):
+        """Reguler & Poleks -> satu ScheduleMatrix (kosong bila tidak ada jadwal)."""
+        return self.project(self.interval_sheets(df_reg, df_pol))
+
+    def interval_sheets(self, df_reg, df_pol):
+        """
+        Tahap yang tidak bergantung grid slot: clean + parse + merge ->
+        list IntervalTable (urut sheet lalu partisi). Hasilnya boleh disimpan
+        & di-project() ulang untuk interval / jam mulai lain.
+        config.workers > 1: tiap sheet dipecah per rentang grup dokter-poli
+        dan semua partisi kedua sheet dijalankan di process pool; hasil
+        digabung urut sheet lalu partisi (sama dengan serial).
+        """
+        self.fix_report = {}
+        workers = self.config.workers
+
+        parts = []
+        for df, jenis in ((df_reg, "Reguler"), (df_pol, "Poleks")):
+            if df.empty:
+                continue
+            with profiler.stage("clean", jenis=jenis, rows=len(df)):
+                df, self.fix_report[jenis] = DataCleaner.clean_block(
+                    df, self.config.hari_list, jenis, self.config.auto_fix_errors)
+            if df.empty:
+                continue
+            if workers > 1:
+                codes = ngroup(df, ["Nama Dokter", "Poli Asal"])
+                parts += [(df.iloc[idx], jenis) for idx in split_codes(codes, workers)]
+            else:
+                parts.append((df, jenis))
 
-        if df.empty:
-            return pd.DataFrame()
+        with profiler.stage("intervals", partitions=len(parts), workers=workers):
+            return run_calls([(self._interval_block, part) for part in parts], workers)
 
+    def project(self, tables):
+        """IntervalTable -> ScheduleMatrix pada grid slot config saat ini."""
         slots = self.generate_slots()
-        slot_str = [t.strftime("%H:%M") for t in slots]
-
-        results = []
-
-        for (dok, poli), group in df.groupby(["Nama Dokter", "Poli Asal"]):
-            for hari in self.config.hari_list:
-                if hari not in group.columns:
-                    continue
-
-                ranges = []
-                for s in group[hari].dropna():
-                    start, end = self.tp.parse(s)
-                    if start and end:
-                        ranges.append((start, end))
-
-                if not ranges:
+        grid = self.grid()
+        slot_start, slot_end = self.engine.slot_bounds(slots)
+        with profiler.stage("schedule", tables=len(tables), slots=len(slots)):
+            mats = [t.project(grid, slot_start, slot_end) for t in tables]
+        return ScheduleMatrix.concat(mats, grid)
+
+    def iter_chunks(self, df_reg, df_pol, chunk_doctors):
+        """
+        Mode streaming: dokter (urut nama) dipecah per chunk_doctors orang;
+        tiap potongan Reguler + Poleks di-clean, parse & project sendiri lalu
+        di-yield sebagai ScheduleMatrix. Semua baris satu dokter selalu ada di
+        potongan yang sama, jadi rekap per dokter cukup dihitung per potongan.
+        Baris matriks urut per potongan (Reguler lalu Poleks di tiap potongan);
+        satu potongan berisi semua dokter = urutan process_sheets.
+        """
+        self.fix_report = {}
+        sheets = [(df, jenis) for df, jenis in ((df_reg, "Reguler"), (df_pol, "Poleks"))
+                  if not df.empty and "Nama Dokter" in df.columns]
+        if not sheets:
+            return
+
+        doctors = pd.Index(pd.concat([df["Nama Dokter"] for df, _ in sheets]).dropna().unique())
+        doctors = doctors.sort_values()
+        # per sheet: baris diurut per kode dokter sekali, tiap potongan = satu irisan
+        parts = []
+        for df, jenis in sheets:
+            codes = doctors.get_indexer(df["Nama Dokter"])
+            order = np.argsort(codes, kind="stable")
+            parts.append((df, jenis, order, codes[order]))
+            self.fix_report[jenis] = 0
+
+        grid = self.grid()
+        slot_start, slot_end = self.engine.slot_bounds(self.generate_slots())
+        for k, chunk in enumerate(chunk_list(np.arange(len(doctors)), chunk_doctors)):
+            lo, hi = chunk[0], chunk[-1] + 1
+            tables = []
+            for df, jenis, order, sorted_codes in parts:
+                a, b = np.searchsorted(sorted_codes, [lo, hi])
+                if a == b:
                     continue
+                block, fixed = DataCleaner.clean_block(df.iloc[order[a:b]], self.config.hari_list,
+                                                       jenis, self.config.auto_fix_errors)
+                self.fix_report[jenis] += fixed
+                tables.append(self._interval_block(block, jenis))
 
-                merged = self.merge_ranges(ranges)
+            with profiler.stage("schedule.chunk", chunk=k, doctors=hi - lo):
+                mat = ScheduleMatrix.concat([t.project(grid, slot_start, slot_end)
+                                             for t in tables], grid)
+            if len(mat):
+                yield mat
 
-                row = {
-                    "POLI ASAL": poli,
-                    "JENIS POLI": jenis,
-                    "HARI": hari,
-                    "DOKTER": dok
-                }
-
-                for i, sl in enumerate(slots):
-                    sl_end = (datetime.combine(datetime.today(), sl) +
-                              timedelta(minutes=self.config.interval_minutes)).time()
-
-                    overlap = any(not (sl_end <= a or sl >= b) for a, b in merged)
-
-                    row[slot_str[i]] = 'R' if overlap and jenis == "Reguler" else \
-                                       'E' if overlap and jenis != "Reguler" else ""
-
-                results.append(row)
-
-        df_out = pd.DataFrame(results)
-        return df_out
+    # FINAL API METHOD
+    def process_schedule(self, df, jenis):
+        with profiler.stage("clean", jenis=jenis, rows=len(df)):
+            df, fixed = DataCleaner.clean_block(df, self.config.hari_list, jenis,
+                                                self.config.auto_fix_errors)
+        self.fix_report[jenis] = fixed
+        return self._schedule_block(df, jenis).to_frame()
+
+    def _schedule_block(self, df, jenis):
+        """Blok yang sudah dibersihkan -> ScheduleMatrix (tanpa state)."""
+        return self.project([self._interval_block(df, jenis)])
+
+    def _interval_block(self, df, jenis):
+        """Blok yang sudah dibersihkan -> IntervalTable (tanpa state, aman di worker process)."""
+        if df.empty:
+            return IntervalTable.empty(jenis)
+
+        hari_list = [h for h in self.config.hari_list if h in df.columns]
+        codes = ngroup(df, ["Nama Dokter", "Poli Asal"])
+
+        # semua range di semua sel hari sekaligus -> array (owner = grup × hari)
+        with profiler.stage("parse", jenis=jenis, cells=len(df) * len(hari_list)):
+            ranges = self.tp.parse_bulk(df[hari_list])
+        ranges = ranges[codes[ranges["row"].to_numpy(dtype=np.int64)] >= 0]
+
+        if ranges.empty:
+            return IntervalTable.empty(jenis)
+
+        day = pd.Categorical(ranges["col"], categories=hari_list).codes
+        owner = codes[ranges["row"].to_numpy(dtype=np.int64)] * len(hari_list) + day
+        with profiler.stage("parse.merge", jenis=jenis, ranges=len(owner)):
+            owner, starts, ends = merge_intervals(owner, ranges["start"].to_numpy(),
+                                                  ranges["end"].to_numpy())
+
+        # satu baris per owner yang punya minimal satu interval (urut grup, lalu hari)
+        used, row = np.unique(owner, return_inverse=True)
+        keys = df[["Nama Dokter", "Poli Asal"]].to_numpy()
+        first_row = np.zeros(codes.max() + 1, dtype=np.int64)
+        grp, pos = np.unique(codes, return_index=True)
+        first_row[grp[grp >= 0]] = pos[grp >= 0]
+
+        rows = first_row[used // len(hari_list)]
+        meta = {
+            "POLI ASAL": keys[rows, 1],
+            "JENIS POLI": np.full(len(used), jenis, dtype=object),
+            "HARI": np.asarray(hari_list, dtype=object)[used % len(hari_list)],
+            "DOKTER": keys[rows, 0],
+        }
+        meta = {c: pd.Categorical(np.asarray(v, dtype=object)) for c, v in meta.items()}
+        return IntervalTable(jenis, meta, row.astype(np.int64), starts.astype(np.int32),
+                             ends.astype(np.int32))
 
     @staticmethod
     def merge_ranges(ranges):
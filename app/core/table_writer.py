@@ -0,0 +1,77 @@
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from .excel_writer import ExcelWriter
+from .readers import parquet_available
+from .schedule_matrix import as_matrix
+from app.utils.profiler import profiler
+
+
+# format ekspor tabel (tanpa openpyxl); satu file per tabel di dalam zip
+TABLE_FORMATS = ("csv", "parquet")
+
+
+class TableWriter:
+    """
+    Ekspor jadwal & tabel rekap sebagai CSV / Parquet untuk konsumen bulk.
+    Isi tabel sama dengan sheet ExcelWriter (judul, kolom & format waktu),
+    tanpa workbook, style maupun grafik.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.excel = ExcelWriter(config)
+        self.aggregator = self.excel.aggregator
+
+    @staticmethod
+    def file_name(title, fmt):
+        return f"{title.lower().replace(' ', '_')}.{fmt}"
+
+    # ======================================================================
+    # Tabel (judul sheet, DataFrame) — urutan sama dengan workbook hasil
+    # ======================================================================
+    def tables(self, df, slot_str, agg=None):
+        mat = as_matrix(df, slot_str, self.config.interval_minutes)
+        if agg is None:
+            with profiler.stage("write.aggregate", rows=len(mat)):
+                agg = self.aggregator.build(mat, mat.slot_str)
+        # baris rekap sama persis dengan sheet xlsx (builder ExcelWriter)
+        recap = [(title, pd.DataFrame(rows, columns=header, dtype=object))
+                 for title, header, rows in self.excel._recap_tables(agg)]
+        return [("Jadwal", self._jadwal(mat))] + recap
+
+    def _jadwal(self, mat):
+        out = mat.meta_frame().replace("", None)
+        text = np.array([None, "R", "E"], dtype=object)[mat.slots]
+        slots = pd.DataFrame(text, columns=mat.slot_str, index=out.index)
+        return pd.concat([out, slots], axis=1)
+
+    # ======================================================================
+    # UTAMA – zip berisi satu file per tabel
+    # ======================================================================
+    def write(self, df, slot_str, fmt="csv", agg=None):
+        if fmt not in TABLE_FORMATS:
+            raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+        if fmt == "parquet" and not parquet_available():
+            raise ImportError("Ekspor Parquet butuh paket pyarrow atau fastparquet")
+
+        tables = self.tables(df, slot_str, agg)
+        buf = io.BytesIO()
+        with profiler.stage("write.tables", format=fmt, tables=len(tables)):
+            with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+                for title, table in tables:
+                    with profiler.stage("write.table", sheet=title, rows=len(table)):
+                        zf.writestr(self.file_name(title, fmt), self._encode(table, fmt))
+        buf.seek(0)
+        return buf
+
+    @staticmethod
+    def _encode(table, fmt):
+        if fmt == "csv":
+            return table.to_csv(index=False).encode("utf-8")
+        out = io.BytesIO()
+        table.to_parquet(out, index=False)
+        return out.getvalue()
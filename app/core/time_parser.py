@@ -1,9 +1,21 @@
 import re
+import numpy as np
 import pandas as pd
 from datetime import time
 
+from app.utils.profiler import profiler
+
+
+RANGE_RE = re.compile(r"(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})")
+
 
 class TimeParser:
+
+    def __init__(self, max_cache=50000):
+        # memo: raw string -> tuple((start_menit, end_menit), ...)
+        self._cache = {}
+        self.max_cache = max_cache
+
     @staticmethod
     def parse(time_str):
         if pd.isna(time_str) or str(time_str).strip() == "":
@@ -11,13 +23,86 @@ class TimeParser:
 
         s = str(time_str).strip().replace(" ", "").replace(".", ":")
 
-        m = re.search(r"(\d{1,2}:\d{2})-(\d{1,2}:\d{2})", s)
+        m = RANGE_RE.search(s)
         if not m:
             return None, None
 
         try:
-            sh, sm = map(int, m.group(1).split(":"))
-            eh, em = map(int, m.group(2).split(":"))
+            sh, sm, eh, em = map(int, m.groups())
             return time(sh, sm), time(eh, em)
         except:
             return None, None
+
+    # ======================================================================
+    # BULK API – semua range di semua sel sekaligus
+    # ======================================================================
+    def parse_bulk(self, data):
+        """
+        Parse Series / blok kolom sekaligus. Satu sel boleh berisi beberapa
+        range ("08.00-10.00 / 13.00-15.00").
+
+        Hasil: DataFrame panjang [row, col, start, end] — row = posisi baris,
+        col = label kolom, start/end = menit sejak 00:00.
+        """
+        frame = data.to_frame() if isinstance(data, pd.Series) else data
+        values = frame.to_numpy(dtype=object)
+
+        rows, cols = np.nonzero(~pd.isna(values))
+        raw = pd.Series(values[rows, cols], dtype=object).astype(str)
+
+        codes, uniques = pd.factorize(raw)
+
+        # tabel range per string unik (flat + offset)
+        with profiler.stage("parse.regex", unique=len(uniques)):
+            self._fill_cache(uniques)
+            per_unique = [self._cache[u] for u in uniques]
+        counts = np.array([len(p) for p in per_unique], dtype=np.int64)
+        if not counts.sum():
+            return pd.DataFrame({"row": [], "col": [], "start": [], "end": []})
+
+        offsets = np.cumsum(counts) - counts
+        flat = np.array([r for p in per_unique for r in p], dtype=np.int32)
+
+        # expand sel -> range (sel dengan k range muncul k kali)
+        cell_counts = counts[codes]
+        cell = np.repeat(np.arange(len(codes)), cell_counts)
+        within = np.arange(len(cell)) - np.repeat(np.cumsum(cell_counts) - cell_counts, cell_counts)
+        pos = offsets[codes[cell]] + within
+
+        return pd.DataFrame({
+            "row": rows[cell],
+            "col": frame.columns.to_numpy()[cols[cell]],
+            "start": flat[pos, 0],
+            "end": flat[pos, 1],
+        })
+
+    def _fill_cache(self, uniques):
+        missing = [u for u in uniques if u not in self._cache]
+        if not missing:
+            return
+
+        # evict dulu, baru tentukan yang perlu di-parse: semua uniques harus
+        # ada di cache setelah pemanggilan ini
+        if len(self._cache) + len(missing) > self.max_cache:
+            self._cache.clear()
+            missing = list(uniques)
+
+        for u in missing:
+            self._cache[u] = ()
+
+        norm = (pd.Series(missing, dtype=object).str.strip()
+                .str.replace(" ", "", regex=False)
+                .str.replace(".", ":", regex=False))
+        found = norm.str.extractall(RANGE_RE)
+        if found.empty:
+            return
+
+        sh, sm, eh, em = (found[i].astype(int).to_numpy() for i in range(4))
+        ok = (sh < 24) & (sm < 60) & (eh < 24) & (em < 60)
+        start = sh * 60 + sm
+        end = eh * 60 + em
+
+        idx = found.index.get_level_values(0).to_numpy()
+        for i, a, b in zip(idx[ok], start[ok], end[ok]):
+            u = missing[i]
+            self._cache[u] = self._cache[u] + ((int(a), int(b)),)
@@ -1,15 +1,155 @@
+import re
+import zipfile
+import posixpath
+from xml.etree.ElementTree import iterparse, fromstring
+
 from openpyxl import load_workbook
+from .workbook import ParsedWorkbook
+
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+REQUIRED_SHEETS = ["Reguler", "Poleks"]
+REQUIRED_HEADERS = ["Nama Dokter", "Poli Asal"]
 
 
 class Validator:
     @staticmethod
     def validate(file):
         try:
-            wb = load_workbook(file)
-            if "Reguler" not in wb.sheetnames:
+            if isinstance(file, ParsedWorkbook):
+                sheetnames = file.sheet_names
+            else:
+                sheetnames = load_workbook(file).sheetnames
+            if "Reguler" not in sheetnames:
                 return False, "Sheet 'Reguler' tidak ditemukan"
-            if "Poleks" not in wb.sheetnames:
+            if "Poleks" not in sheetnames:
                 return False, "Sheet 'Poleks' tidak ditemukan"
             return True, None
         except Exception as e:
             return False, str(e)
+
+    # ======================================================================
+    # MODE CEPAT – hanya manifest zip + workbook.xml, tanpa load sel
+    # ======================================================================
+    @staticmethod
+    def validate_fast(file, max_bytes=None, max_rows=None):
+        try:
+            parsed = ParsedWorkbook.from_upload(file)
+            if max_bytes and len(parsed.data) > max_bytes:
+                return False, (f"Ukuran file {len(parsed.data) / 2**20:.1f} MB melebihi "
+                               f"batas {max_bytes / 2**20:.0f} MB")
+            if not parsed.is_excel:
+                return Validator._validate_table(parsed, max_rows)
+
+            with zipfile.ZipFile(parsed.buffer()) as zf:
+                names = set(zf.namelist())
+                if "xl/workbook.xml" not in names:
+                    return False, "Bukan file .xlsx yang valid (xl/workbook.xml tidak ada)"
+
+                sheets = Validator._sheet_parts(zf)
+                for name in REQUIRED_SHEETS:
+                    if name not in sheets:
+                        return False, f"Sheet '{name}' tidak ditemukan"
+
+                shared = None
+                for name in REQUIRED_SHEETS:
+                    if sheets[name] not in names:
+                        return False, f"Sheet '{name}' rusak (part tidak ditemukan)"
+
+                    n_rows, header = Validator._sheet_head(zf, sheets[name])
+                    if max_rows and n_rows and n_rows - 1 > max_rows:
+                        return False, (f"Sheet '{name}' berisi {n_rows - 1} baris, "
+                                       f"melebihi batas {max_rows}")
+
+                    # sheet kosong tetap lolos (sama seperti validate)
+                    if not header:
+                        continue
+
+                    need = max((int(v) for kind, v in header if kind == "s"), default=-1)
+                    if need >= len(shared or []):
+                        shared = Validator._shared_strings(zf, need)
+
+                    cols = {Validator._header_text(kind, v, shared) for kind, v in header}
+                    miss = [c for c in REQUIRED_HEADERS if c not in cols]
+                    if miss:
+                        return False, f"Sheet '{name}' tidak memiliki kolom {miss}"
+
+            return True, None
+        except Exception as e:
+            return False, str(e)
+
+    @staticmethod
+    def _validate_table(parsed, max_rows=None):
+        """CSV / Parquet: tabel dibaca utuh (murah), cek jumlah baris & kolom wajib."""
+        total = 0
+        for name in REQUIRED_SHEETS:
+            df = parsed.sheet(name)
+            total += len(df)
+            if not len(df.columns):
+                continue
+            cols = {str(c).strip() for c in df.columns}
+            miss = [c for c in REQUIRED_HEADERS if c not in cols]
+            if miss:
+                return False, f"File {parsed.format.upper()} tidak memiliki kolom {miss}"
+        if max_rows and total > max_rows:
+            return False, f"File berisi {total} baris, melebihi batas {max_rows}"
+        return True, None
+
+    @staticmethod
+    def _sheet_parts(zf):
+        """nama sheet -> path part worksheet di dalam zip."""
+        wb = fromstring(zf.read("xl/workbook.xml"))
+        rels = fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        target = {r.get("Id"): r.get("Target") for r in rels.iter(f"{NS_PKG}Relationship")}
+
+        parts = {}
+        for s in wb.iter(f"{NS_MAIN}sheet"):
+            t = target.get(s.get(f"{NS_REL}id"), "")
+            parts[s.get("name")] = t.lstrip("/") if t.startswith("/") else posixpath.normpath("xl/" + t)
+        return parts
+
+    @staticmethod
+    def _sheet_head(zf, part):
+        """(jumlah baris dari <dimension>, isi baris pertama) — berhenti setelah baris 1."""
+        n_rows, header = None, []
+        with zf.open(part) as f:
+            for _, el in iterparse(f):
+                if el.tag == f"{NS_MAIN}dimension":
+                    m = re.search(r"(\d+)$", el.get("ref", ""))
+                    n_rows = int(m.group(1)) if m else None
+                elif el.tag == f"{NS_MAIN}row":
+                    for c in el.iter(f"{NS_MAIN}c"):
+                        kind = c.get("t", "n")
+                        if kind == "inlineStr":
+                            v = "".join(t.text or "" for t in c.iter(f"{NS_MAIN}t"))
+                        else:
+                            v = c.findtext(f"{NS_MAIN}v")
+                        if v is not None:
+                            header.append((kind, v))
+                    break
+        return n_rows, header
+
+    @staticmethod
+    def _shared_strings(zf, upto):
+        """Shared string index 0..upto saja (tidak membaca seluruh tabel)."""
+        out = []
+        if "xl/sharedStrings.xml" not in zf.namelist():
+            return out
+        with zf.open("xl/sharedStrings.xml") as f:
+            for _, el in iterparse(f):
+                if el.tag == f"{NS_MAIN}si":
+                    out.append("".join(t.text or "" for t in el.iter(f"{NS_MAIN}t")))
+                    el.clear()
+                    if len(out) > upto:
+                        break
+        return out
+
+    @staticmethod
+    def _header_text(kind, v, shared):
+        if kind == "s":
+            i = int(v)
+            return shared[i].strip() if shared and i < len(shared) else ""
+        return str(v).strip()
@@ -0,0 +1,119 @@
+import io
+import threading
+from functools import cached_property
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+from .readers import PandasSource, TableSource, detect_format, open_source
+from app.utils.profiler import profiler
+
+
+class ParsedWorkbook:
+    """
+    File upload dibaca sekali: bytes dan DataFrame per sheet dipakai bersama
+    oleh Validator, preview, Scheduler dan ExcelWriter. Sheet input dibaca
+    lewat backend `reader` (lihat readers.py); workbook openpyxl penuh dimuat
+    baru untuk tiap ekspor (open_workbook) karena ExcelWriter menulis ke dalamnya.
+    Input CSV / Parquet (format != "xlsx") dibaca lewat TableSource; workbook
+    untuk ExcelWriter dibangun dari sheet Reguler & Poleks hasil pecahannya.
+    """
+
+    def __init__(self, data, name=None, reader="auto"):
+        self.data = data
+        self.name = name
+        self.reader = reader
+        self.format = detect_format(data, name)
+        self._frames = {}
+        # objek ini dipakai bersama antar rerun/sesi (st.cache_resource):
+        # baca sheet ke cache frame bergantian
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_upload(cls, file, reader="auto"):
+        if isinstance(file, cls):
+            return file
+        if isinstance(file, (bytes, bytearray)):
+            return cls(bytes(file), reader=reader)
+        if hasattr(file, "getvalue"):
+            return cls(file.getvalue(), getattr(file, "name", None), reader)
+        if hasattr(file, "read"):
+            return cls(file.read(), getattr(file, "name", None), reader)
+        with open(file, "rb") as f:
+            return cls(f.read(), str(file), reader)
+
+    def buffer(self):
+        return io.BytesIO(self.data)
+
+    @property
+    def is_excel(self):
+        return self.format == "xlsx"
+
+    def open_workbook(self):
+        """Workbook openpyxl penuh yang baru (milik pemanggil, aman ditulisi)."""
+        if not self.is_excel:
+            return self._table_workbook()
+        with profiler.stage("read.workbook", bytes=len(self.data)):
+            return load_workbook(self.buffer())
+
+    def _table_workbook(self):
+        wb = Workbook()
+        wb.remove(wb.active)
+        with profiler.stage("read.workbook", format=self.format, bytes=len(self.data)):
+            for name in self.sheet_names:
+                df = self.sheet(name)
+                ws = wb.create_sheet(name)
+                ws.append([str(c) for c in df.columns])
+                for row in df.astype(object).where(df.notna(), None).itertuples(index=False):
+                    ws.append(list(row))
+        return wb
+
+    @cached_property
+    def source(self):
+        """Sumber baca sheet input (backend pertama yang berhasil dibuka)."""
+        if not self.is_excel:
+            # CSV / Parquet tidak punya cadangan: error baca diteruskan apa adanya
+            with profiler.stage("read.open", format=self.format, bytes=len(self.data)):
+                return TableSource.open(self.buffer(), self.format)
+        if self.reader == "pandas":
+            return self._pandas_source()
+        try:
+            with profiler.stage("read.open", backend=self.reader, bytes=len(self.data)):
+                return open_source(self.buffer(), self.reader)
+        except Exception:
+            # backend cepat tidak tersedia / gagal membuka file -> backend pandas
+            return self._pandas_source()
+
+    def _pandas_source(self):
+        # dari bytes, bukan open_workbook(): workbook tulis memuat teks formula
+        # (tanpa data_only), bukan nilai sel
+        with profiler.stage("read.open", backend="pandas", bytes=len(self.data)):
+            return PandasSource(self.buffer())
+
+    @property
+    def sheet_names(self):
+        return self.source.sheet_names
+
+    def sheet(self, name):
+        with self.lock:
+            if name not in self._frames:
+                with profiler.stage("read.sheet", sheet=name, backend=self.source.name):
+                    try:
+                        df = self.source.read(name)
+                    except Exception:
+                        if (not self.is_excel or self.source.name == "pandas"
+                                or name not in self.sheet_names):
+                            raise
+                        # backend cepat gagal pada file ini -> backend pandas
+                        self.source = self._pandas_source()
+                        df = self.source.read(name)
+                self._frames[name] = df
+        return self._frames[name]
+
+    def sheet_or_empty(self, name):
+        if name not in self.sheet_names:
+            return pd.DataFrame()
+        try:
+            return self.sheet(name)
+        except Exception:
+            return pd.DataFrame()
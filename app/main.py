@@ -1,11 +1,11 @@
 # app/main.py
 
 import streamlit as st
-import pandas as pd
 
 from app.config import Config
 from app.core.scheduler import Scheduler
 from app.core.excel_writer import ExcelWriter
+from app.core.workbook import ParsedWorkbook
 from app.ui.sidebar import render_sidebar
 
 def main():
@@ -14,25 +14,21 @@ def main():
 
     st.title("🚀 Pengolah Jadwal Poli Modular")
 
-    uploaded = st.file_uploader("Upload Excel", type=['xlsx'])
+    uploaded = st.file_uploader("Upload Excel / CSV / Parquet", type=['xlsx', 'csv', 'parquet'])
 
     if uploaded:
-        df_reg = pd.read_excel(uploaded, sheet_name='Reguler')
-        df_pol = pd.read_excel(uploaded, sheet_name='Poleks')
+        parsed = ParsedWorkbook.from_upload(uploaded, config.reader)
+        df_reg = parsed.sheet('Reguler')
+        df_pol = parsed.sheet('Poleks')
 
         scheduler = Scheduler(config)
 
-        df_r = scheduler.process(df_reg, "Reguler")
-        df_e = scheduler.process(df_pol, "Poleks")
+        mat = scheduler.process_sheets(df_reg, df_pol)
 
-        df_final = pd.concat([df_r, df_e]).reset_index(drop=True)
-
-        st.dataframe(df_final)
-
-        slots = [c for c in df_final.columns if ':' in c]
+        st.dataframe(mat.to_frame())
 
         writer = ExcelWriter(config)
-        buf = writer.write(uploaded, df_final, slots)
+        buf = writer.write(parsed, mat, scheduler.slot_labels())
 
         st.download_button(
             "Download Excel Hasil",
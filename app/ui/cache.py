@@ -0,0 +1,124 @@
+# app/ui/cache.py
+"""
+Cache pipeline upload per tahap, supaya rerun Streamlit (klik checkbox,
+pindah tab) tidak mengulang parsing/proses/ekspor untuk file yang sama.
+
+Kunci tiap tahap = sha256 isi file + field Config yang relevan saja:
+ubah max_poleks_per_slot -> hanya ekspor yang diulang; ubah interval / jam
+mulai -> interval hasil parse dipakai ulang, hanya proyeksi ke slot diulang.
+Parameter berawalan "_" tidak di-hash Streamlit (objek besar / tidak hashable).
+Di bawah cache memori ada ResultCache di disk (bertahan setelah restart).
+"""
+import hashlib
+
+import streamlit as st
+
+from app.config import PROCESS_FIELDS, INTERVAL_FIELDS, EXPORT_FIELDS
+from app.core.validator import Validator
+from app.core.workbook import ParsedWorkbook
+from app.core.result_cache import ResultCache
+
+# batas cache per tahap: jumlah entri & umur (detik)
+MAX_ENTRIES = 8
+TTL = 60 * 60
+
+
+def upload_key(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def interval_key(config):
+    return config.fingerprint(INTERVAL_FIELDS)
+
+
+def process_key(config):
+    return config.fingerprint(PROCESS_FIELDS)
+
+
+def export_key(config):
+    return config.fingerprint(EXPORT_FIELDS)
+
+
+@st.cache_resource(show_spinner=False)
+def disk_cache(root, max_mb):
+    return ResultCache(root, max_mb)
+
+
+def _disk(config):
+    if not config.result_cache:
+        return None
+    try:
+        return disk_cache(config.result_cache_dir, config.result_cache_mb)
+    except OSError:
+        return None
+
+
+@st.cache_resource(max_entries=MAX_ENTRIES, ttl=TTL, show_spinner=False)
+def load_upload(key, _data, name=None, reader="auto"):
+    """Satu ParsedWorkbook per isi file (& backend pembaca), dipakai bersama antar rerun."""
+    return ParsedWorkbook(_data, name, reader)
+
+
+@st.cache_data(max_entries=MAX_ENTRIES, ttl=TTL, show_spinner=False)
+def validate(key, max_bytes, max_rows, _parsed):
+    return Validator.validate_fast(_parsed, max_bytes, max_rows)
+
+
+@st.cache_data(max_entries=MAX_ENTRIES, ttl=TTL, show_spinner=False)
+def read_sheets(key, _parsed):
+    """(df Reguler, df Poleks) — DataFrame kosong bila sheet tidak ada."""
+    return _parsed.sheet_or_empty("Reguler"), _parsed.sheet_or_empty("Poleks")
+
+
+@st.cache_data(max_entries=MAX_ENTRIES, ttl=TTL, show_spinner=False)
+def intervals(key, int_key, _scheduler, _parsed):
+    """
+    (list IntervalTable, fix_report) — clean + parse + merge, tidak bergantung
+    grid slot. None bila sheet Reguler & Poleks sama-sama kosong.
+    """
+    df_reg, df_pol = read_sheets(key, _parsed)
+    if df_reg.empty and df_pol.empty:
+        return None, {}
+    tables = _scheduler.interval_sheets(df_reg, df_pol)
+    return tables, dict(_scheduler.fix_report)
+
+
+@st.cache_data(max_entries=MAX_ENTRIES, ttl=TTL, show_spinner=False)
+def process(key, proc_key, _scheduler, _parsed):
+    """
+    (ScheduleMatrix, fix_report) — fix_report ikut di-cache karena scheduler
+    baru kosong. Matriks None bila sheet Reguler & Poleks sama-sama kosong.
+    """
+    disk = _disk(_scheduler.config)
+    disk_key = disk.schedule_key(key, _scheduler.config) if disk else None
+    hit = disk.get_schedule(disk_key) if disk else None
+    if hit is not None:
+        return hit
+
+    tables, fix_report = intervals(key, interval_key(_scheduler.config), _scheduler, _parsed)
+    if tables is None:
+        return None, {}
+
+    df_all = _scheduler.project(tables)
+    if disk:
+        disk.put_schedule(disk_key, df_all, fix_report)
+    return df_all, fix_report
+
+
+@st.cache_data(max_entries=MAX_ENTRIES, ttl=TTL, show_spinner=False)
+def export(key, proc_key, exp_key, slot_str, _writer, _parsed, _df_all):
+    """Bytes xlsx hasil (bukan BytesIO, supaya bisa di-pickle oleh cache_data)."""
+    disk = _disk(_writer.config)
+    disk_key = disk.export_key(key, _writer.config) if disk else None
+    data = disk.get_export(disk_key) if disk else None
+    if data is None:
+        data = _writer.write(_parsed, _df_all, list(slot_str)).getvalue()
+        if disk:
+            disk.put_export(disk_key, data)
+    return data
+
+
+@st.cache_data(max_entries=MAX_ENTRIES, ttl=TTL, show_spinner=False)
+def export_tables(key, proc_key, fmt, slot_str, _table_writer, _df_all):
+    """Bytes zip CSV / Parquet (satu file per tabel), tanpa openpyxl."""
+    return _table_writer.write(_df_all, list(slot_str), fmt).getvalue()
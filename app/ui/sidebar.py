@@ -1,5 +1,7 @@
 import streamlit as st
 
+from app.core.readers import available_backends
+
 
 def render_sidebar(config):
     with st.sidebar:
@@ -28,4 +30,35 @@ def render_sidebar(config):
             "Maks Poleks per slot", 1, 50, config.max_poleks_per_slot
         )
 
+        config.streaming_export = st.checkbox(
+            "Ekspor hemat memori (streaming)",
+            value=config.streaming_export
+        )
+
+        config.style_mode = "rules" if st.checkbox(
+            "Pewarnaan via conditional formatting (file lebih kecil)",
+            value=config.style_mode == "rules"
+        ) else "cell"
+
+        config.workers = st.number_input(
+            "Worker process paralel (1 = serial)", 1, 16, config.workers
+        )
+
+        backends = ["auto"] + available_backends()
+        config.reader = st.selectbox(
+            "Pembaca Excel", backends,
+            index=backends.index(config.reader) if config.reader in backends else 0,
+            help="auto: calamine bila terpasang, selain itu openpyxl read-only"
+        )
+
+        config.profiling = st.checkbox(
+            "Profiling per tahap (tab Performa)",
+            value=config.profiling
+        )
+        config.profiling_memory = st.checkbox(
+            "Ukur memori (tracemalloc, lebih lambat)",
+            value=config.profiling_memory,
+            disabled=not config.profiling
+        )
+
         st.caption("Pengaturan tersimpan selama session berjalan.")
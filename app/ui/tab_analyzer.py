@@ -1,19 +1,20 @@
 # app/ui/tab_analyzer.py
 import streamlit as st
 import pandas as pd
+from app.core.schedule_matrix import as_matrix
+from app.core.workbook import ParsedWorkbook
 
-def render_analyzer_tab(analyzer, config):
+def render_analyzer_tab(analyzer, writer, config):
     st.subheader("🔍 Error Analyzer")
 
-    uploaded = st.file_uploader("Upload file untuk analisis (jika belum diupload di tab Upload)", type=['xlsx'], key="analyzer_uploader")
+    uploaded = st.file_uploader("Upload file untuk analisis (jika belum diupload di tab Upload)", type=['xlsx', 'csv', 'parquet'], key="analyzer_uploader")
     if uploaded is not None:
         try:
-            df_reg = pd.read_excel(uploaded, sheet_name='Reguler')
+            parsed = ParsedWorkbook.from_upload(uploaded, config.reader)
+            df_reg = parsed.sheet_or_empty('Reguler')
+            df_pol = parsed.sheet_or_empty('Poleks')
         except Exception:
             df_reg = pd.DataFrame()
-        try:
-            df_pol = pd.read_excel(uploaded, sheet_name='Poleks')
-        except Exception:
             df_pol = pd.DataFrame()
 
         if not df_reg.empty:
@@ -29,11 +30,39 @@ def render_analyzer_tab(analyzer, config):
             st.text(analyzer.format_report(rep2))
         else:
             st.info("Sheet 'Poleks' tidak ditemukan atau kosong.")
+
+        _render_issues(analyzer, writer, config, {"Reguler": df_reg, "Poleks": df_pol})
     else:
         # gunakan data yang sudah diproses jika ada
         if 'processed_data' in st.session_state and st.session_state['processed_data'] is not None:
-            df = st.session_state['processed_data']
+            mat = as_matrix(st.session_state['processed_data'], st.session_state.get('time_slots'))
             st.write("Menggunakan data yang sudah diproses.")
-            st.dataframe(df.head(20), use_container_width=True)
+            st.dataframe(mat.to_frame(slice(0, 20)), use_container_width=True)
         else:
             st.info("Tidak ada data. Upload file pada tab Upload & Proses atau gunakan uploader di atas.")
+
+
+def _render_issues(analyzer, writer, config, sheets):
+    """Tabel diagnostik per sel (semua sheet) + unduhan sebagai sheet Excel."""
+    window = analyzer.slot_window(config)
+    frames = [analyzer.issues(df, config.hari_list, name, window)
+              for name, df in sheets.items() if not df.empty]
+    if not frames:
+        return
+
+    issues = pd.concat(frames, ignore_index=True)
+    st.markdown("**Diagnostik per sel**")
+    if issues.empty:
+        st.success("Tidak ada masalah pada sel jadwal.")
+        return
+
+    st.dataframe(analyzer.summary(issues), use_container_width=True)
+    kinds = st.multiselect("Filter masalah", sorted(issues["MASALAH"].unique()))
+    shown = issues[issues["MASALAH"].isin(kinds)] if kinds else issues
+    st.dataframe(shown, use_container_width=True)
+    st.download_button(
+        "📥 Download Diagnostik",
+        data=writer.write_issues(issues).getvalue(),
+        file_name="diagnostik_jadwal.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
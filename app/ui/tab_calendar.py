@@ -0,0 +1,115 @@
+# app/ui/tab_calendar.py
+import datetime as dt
+
+import pandas as pd
+import streamlit as st
+
+from app.core.roster_calendar import RosterCalendar
+
+
+CLOSURE_TEMPLATE = pd.DataFrame({"MULAI": pd.Series(dtype="datetime64[ns]"),
+                                 "SELESAI": pd.Series(dtype="datetime64[ns]"),
+                                 "DOKTER": pd.Series(dtype=object),
+                                 "POLI": pd.Series(dtype=object),
+                                 "KET": pd.Series(dtype=object)})
+SESSION_TEMPLATE = pd.DataFrame({"TANGGAL": pd.Series(dtype="datetime64[ns]"),
+                                 "DOKTER": pd.Series(dtype=object),
+                                 "POLI": pd.Series(dtype=object),
+                                 "JENIS": pd.Series(dtype=object),
+                                 "WAKTU": pd.Series(dtype=object)})
+
+
+def _calendar(mat):
+    """Satu RosterCalendar per matriks hasil proses (dibuat ulang bila jadwal berubah)."""
+    cal = st.session_state.get("roster_calendar")
+    if cal is None or cal.template is not mat:
+        cal = RosterCalendar(mat)
+        st.session_state["roster_calendar"] = cal
+    return cal
+
+
+def _text(v):
+    return None if pd.isna(v) or not str(v).strip() else str(v).strip()
+
+
+def _apply_exceptions(cal, closures, sessions):
+    """Pengecualian dari tabel editor -> calendar (murah: jumlah baris sedikit)."""
+    cal.clear_exceptions()
+    errors = []
+    for r in closures.dropna(subset=["MULAI"]).itertuples(index=False):
+        try:
+            cal.close(r.MULAI, None if pd.isna(r.SELESAI) else r.SELESAI,
+                      dokter=_text(r.DOKTER), poli=_text(r.POLI), ket=_text(r.KET) or "")
+        except ValueError as e:
+            errors.append(str(e))
+    for r in sessions.dropna(subset=["TANGGAL", "DOKTER", "WAKTU"]).itertuples(index=False):
+        try:
+            cal.add_session(r.TANGGAL, _text(r.DOKTER), _text(r.POLI) or "", r.WAKTU,
+                            _text(r.JENIS) or "Reguler")
+        except ValueError as e:
+            errors.append(str(e))
+    return errors
+
+
+def render_calendar_tab(writer, config):
+    st.subheader("📅 Kalender Roster")
+
+    mat = st.session_state.get("processed_data")
+    if mat is None or mat.empty:
+        st.info("Belum ada data hasil proses. Jalankan proses di tab Upload & Proses.")
+        return
+
+    cal = _calendar(mat)
+    st.caption("Template mingguan disimpan sekali; libur, cuti & sesi tambahan dicatat "
+               "per tanggal tanpa mengekspansi roster penuh.")
+
+    today = dt.date.today()
+    picked = st.date_input("Rentang tanggal", (today, today + dt.timedelta(days=90)),
+                           key="calendar_range")
+    if len(picked) != 2:
+        st.info("Pilih tanggal mulai & selesai.")
+        return
+    start, end = picked
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Libur / cuti** (DOKTER / POLI kosong = semua)")
+        closures = st.data_editor(CLOSURE_TEMPLATE, num_rows="dynamic",
+                                  use_container_width=True, key="calendar_closures_editor")
+    with col2:
+        st.markdown("**Sesi tambahan** (mis. poli Sabtu)")
+        sessions = st.data_editor(SESSION_TEMPLATE, num_rows="dynamic",
+                                  use_container_width=True, key="calendar_sessions_editor")
+
+    for err in _apply_exceptions(cal, closures, sessions):
+        st.warning(err)
+
+    # ================== BEBAN HARIAN ======================
+    load = cal.day_load(start, end)
+    st.markdown("**Beban harian**")
+    st.bar_chart(load.set_index("TANGGAL")[["JAM REG", "JAM POLEKS"]])
+    st.dataframe(load, use_container_width=True)
+
+    # ================== SIAPA BERTUGAS ====================
+    st.write("---")
+    c1, c2 = st.columns(2)
+    day = c1.date_input("Tanggal", start, key="calendar_day")
+    jam = c2.time_input("Jam", dt.time(10, 0), step=dt.timedelta(minutes=config.interval_minutes),
+                        key="calendar_time")
+    duty = cal.on_duty(dt.datetime.combine(day, jam))
+    st.write(f"{len(duty)} jadwal aktif pada {day:%d-%m-%Y} {jam:%H:%M}")
+    st.dataframe(duty, use_container_width=True)
+
+    # ================== EKSPOR ============================
+    st.write("---")
+    if st.button("📦 Buat roster bertanggal"):
+        try:
+            buf = writer.write_calendar(cal, start, end)
+            st.download_button(
+                "📥 Download Roster Bertanggal",
+                data=buf.getvalue(),
+                file_name=f"roster_{start:%Y%m%d}_{end:%Y%m%d}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        except Exception as e:
+            st.error(f"Gagal membuat roster bertanggal: {e}")
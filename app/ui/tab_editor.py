@@ -0,0 +1,60 @@
+# app/ui/tab_editor.py
+import streamlit as st
+from app.utils.profiler import profiler
+
+
+def render_editor_tab(writer, config):
+    st.subheader("✏️ Edit Jadwal")
+
+    engine = st.session_state.get("schedule_engine")
+    if engine is None:
+        st.info("Belum ada data hasil proses. Jalankan proses di tab Upload & Proses.")
+        return
+
+    if engine.stale:
+        st.warning("Pengaturan proses berubah sejak file diproses. Proses ulang file sebelum mengedit.")
+        return
+
+    st.caption("Ubah jam praktik langsung di tabel lalu terapkan. Hanya dokter-poli "
+               "yang diubah yang dijadwalkan ulang.")
+    jenis = st.radio("Sheet", engine.SHEETS, horizontal=True, key="editor_sheet")
+
+    # key ikut revisi -> editor dibuat ulang dari input terbaru setelah edit diterapkan
+    with st.form(f"editor_form_{jenis}_{engine.revision}"):
+        edited = st.data_editor(engine.frames[jenis], num_rows="dynamic",
+                                use_container_width=True,
+                                key=f"editor_{jenis}_{engine.revision}")
+        submitted = st.form_submit_button("💾 Terapkan perubahan")
+
+    if submitted:
+        profiler.start_run(f"edit {jenis}")
+        try:
+            n = engine.apply_edit(jenis, edited)
+        except Exception as e:
+            st.error(f"Gagal menerapkan perubahan: {e}")
+            return
+
+        if n:
+            st.session_state["processed_data"] = engine.matrix
+            st.success(f"✅ {n} grup dokter-poli dijadwalkan ulang.")
+        else:
+            st.info("Tidak ada perubahan.")
+        if config.profiling:
+            st.session_state["perf_last_run"] = profiler.snapshot()
+
+    if not engine.revision:
+        return
+
+    st.write("---")
+    if st.button("📦 Buat file hasil edit"):
+        try:
+            buf = writer.write(st.session_state["source_workbook"], engine.matrix,
+                               engine.matrix.slot_str, agg=engine.aggregates)
+            st.download_button(
+                "📥 Download Jadwal Hasil Edit",
+                data=buf.getvalue(),
+                file_name="jadwal_hasil_edit.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        except Exception as e:
+            st.error(f"Gagal membuat file Excel hasil: {e}")
@@ -0,0 +1,39 @@
+# app/ui/tab_performance.py
+import streamlit as st
+import pandas as pd
+
+
+def render_performance_tab(config):
+    st.subheader("⏱️ Performa")
+
+    if not config.profiling:
+        st.info("Profiling nonaktif. Aktifkan di sidebar, lalu proses jadwal di tab Upload.")
+
+    snap = st.session_state.get("perf_last_run")
+    if not snap or not snap["records"]:
+        st.info("Belum ada data profiling untuk run terakhir.")
+        return
+
+    df = pd.DataFrame(snap["records"])
+    top = df[df["depth"] == 0]
+
+    st.caption(f"Run terakhir: {snap['run']}")
+    c1, c2 = st.columns(2)
+    c1.metric("Total waktu", f"{top['wall_s'].sum():.2f} s")
+    if "peak_mb" in df.columns:
+        c2.metric("Peak memori (maks tahap)", f"{df['peak_mb'].max():.1f} MB")
+
+    # rekap per nama tahap (tahap paralel/berulang dijumlah)
+    agg = {"wall_s": "sum", "depth": "min"}
+    if "peak_mb" in df.columns:
+        agg["peak_mb"] = "max"
+    per_stage = df.groupby("stage", sort=False).agg(agg)
+    per_stage["n"] = df.groupby("stage", sort=False).size()
+    per_stage = per_stage.sort_values("wall_s", ascending=False)
+
+    st.markdown("**Waktu per tahap (detik)**")
+    st.bar_chart(per_stage["wall_s"])
+    st.dataframe(per_stage, use_container_width=True)
+
+    with st.expander("Detail record"):
+        st.dataframe(df, use_container_width=True)
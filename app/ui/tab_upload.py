@@ -1,11 +1,16 @@
 # app/ui/tab_upload.py
 import streamlit as st
 import pandas as pd
-from app.core.validator import Validator
+from app.core.incremental import IncrementalScheduler
+from app.core.readers import parquet_available
+from app.core.table_writer import TableWriter
+from app.ui import cache
+from app.utils.profiler import profiler
 
 def render_upload_tab(scheduler, writer, analyzer, config):
     st.subheader("📤 Upload Jadwal")
-    st.info("Silakan upload file Excel berformat Reguler & Poleks.")
+    st.info("Silakan upload file Excel berformat Reguler & Poleks, atau satu tabel "
+            "CSV / Parquet dengan kolom yang sama (baris dipisah menurut kolom 'Jenis Poli').")
 
     # ====== siapkan slot_str dari scheduler (list "HH:MM") ======
     try:
@@ -19,7 +24,7 @@ def render_upload_tab(scheduler, writer, analyzer, config):
     # ================= TEMPLATE DOWNLOAD =================
     st.subheader("📄 Download Template Excel")
     if st.button("📥 Download Template Jadwal"):
-        template_buf = writer.generate_template(slot_str)
+        template_buf = writer.generate_template()
         st.download_button(
             label="Klik untuk Download Template",
             data=template_buf,
@@ -30,55 +35,48 @@ def render_upload_tab(scheduler, writer, analyzer, config):
     st.write("---")
 
     # ================== FILE UPLOADER =====================
-    uploaded = st.file_uploader("Upload file Excel (.xlsx)", type=["xlsx"])
+    uploaded = st.file_uploader("Upload file jadwal (.xlsx / .csv / .parquet)",
+                                type=["xlsx", "csv", "parquet"])
 
     if not uploaded:
         return
 
-    ok, err = Validator.validate(uploaded)
+    # file dibaca sekali per isi (hash), dipakai validasi, preview, proses & export
+    data = uploaded.getvalue()
+    key = cache.upload_key(data)
+    parsed = cache.load_upload(key, data, uploaded.name, config.reader)
+
+    # cek manifest & header saja, sebelum parsing berat
+    ok, err = cache.validate(key, config.max_upload_mb * 1024 * 1024, config.max_rows, parsed)
     if not ok:
         st.error(f"❌ File tidak valid: {err}")
         return
 
-    try:
-        xl = pd.ExcelFile(uploaded)
-        st.success(f"File valid. Sheets: {xl.sheet_names}")
-    except Exception as e:
-        st.error(f"Gagal membaca file Excel: {e}")
-        return
+    st.success(f"File valid. Sheets: {parsed.sheet_names}")
 
-    if "Reguler" in xl.sheet_names and st.checkbox("Preview sheet Reguler"):
+    if "Reguler" in parsed.sheet_names and st.checkbox("Preview sheet Reguler"):
         try:
-            st.dataframe(pd.read_excel(uploaded, sheet_name="Reguler", nrows=10))
+            st.dataframe(cache.read_sheets(key, parsed)[0].head(10))
         except Exception as e:
             st.warning(f"Gagal preview sheet Reguler: {e}")
 
     # ================== PROSES ============================
     if st.button("🚀 Proses Jadwal"):
 
-        try:
-            df_reg = xl.parse("Reguler") if "Reguler" in xl.sheet_names else pd.DataFrame()
-        except Exception:
-            df_reg = pd.DataFrame()
-
-        try:
-            df_pol = xl.parse("Poleks") if "Poleks" in xl.sheet_names else pd.DataFrame()
-        except Exception:
-            df_pol = pd.DataFrame()
-
-        if df_reg.empty and df_pol.empty:
-            st.warning("File tidak berisi data di sheet 'Reguler' atau 'Poleks'.")
-            return
+        proc_key = cache.process_key(config)
+        profiler.start_run(uploaded.name)
 
         with st.spinner("Memproses jadwal..."):
             try:
-                df_r = scheduler.process_schedule(df_reg, "Reguler") if not df_reg.empty else pd.DataFrame()
-                df_e = scheduler.process_schedule(df_pol, "Poleks") if not df_pol.empty else pd.DataFrame()
-                df_all = pd.concat([df_r, df_e], ignore_index=True) if (not df_r.empty or not df_e.empty) else pd.DataFrame()
+                df_all, fix_report = cache.process(key, proc_key, scheduler, parsed)
             except Exception as e:
                 st.error(f"Gagal memproses jadwal: {e}")
                 return
 
+        if df_all is None:
+            st.warning("File tidak berisi data di sheet 'Reguler' atau 'Poleks'.")
+            return
+
         if df_all.empty:
             st.warning("Hasil proses kosong. Periksa kembali input Anda.")
             return
@@ -87,12 +85,22 @@ def render_upload_tab(scheduler, writer, analyzer, config):
         st.session_state["processed_data"] = df_all
         st.session_state["time_slots"] = slot_str
 
+        # editor jadwal (tab Edit): input bersih + matriks ini, edit ditambal inkremental
+        st.session_state["schedule_engine"] = IncrementalScheduler(
+            scheduler, *cache.read_sheets(key, parsed), mat=df_all)
+        st.session_state["source_workbook"] = parsed
+
         st.success("✅ Jadwal berhasil diproses!")
-        st.dataframe(df_all, use_container_width=True)
+        fixed = sum(fix_report.values())
+        if fixed:
+            st.caption(f"Auto-fix memperbaiki {fixed} sel waktu: " +
+                       ", ".join(f"{k} {v}" for k, v in fix_report.items()))
+        st.dataframe(df_all.to_frame(), use_container_width=True)
 
         # SAVE -> gunakan slot_str
         try:
-            buf = writer.write(uploaded, df_all, slot_str)
+            buf = cache.export(key, proc_key, cache.export_key(config), slot_str,
+                               writer, parsed, df_all)
             st.download_button(
                 "📥 Download Jadwal Hasil",
                 data=buf,
@@ -101,3 +109,22 @@ def render_upload_tab(scheduler, writer, analyzer, config):
             )
         except Exception as e:
             st.error(f"Gagal membuat file Excel hasil: {e}")
+
+        # ekspor tabel untuk konsumen bulk (tanpa ExcelWriter)
+        formats = ["csv"] + (["parquet"] if parquet_available() else [])
+        for fmt, col in zip(formats, st.columns(len(formats))):
+            try:
+                data_zip = cache.export_tables(key, proc_key, fmt, slot_str,
+                                               TableWriter(config), df_all)
+                col.download_button(
+                    f"📦 Download {fmt.upper()} (.zip)",
+                    data=data_zip,
+                    file_name=f"jadwal_hasil_{fmt}.zip",
+                    mime="application/zip",
+                )
+            except Exception as e:
+                col.error(f"Gagal membuat ekspor {fmt.upper()}: {e}")
+
+        # tahap yang tidak tercatat = diambil dari cache
+        if config.profiling:
+            st.session_state["perf_last_run"] = profiler.snapshot()
@@ -1,7 +1,9 @@
 # app/ui/tab_visualization.py
 import streamlit as st
 import plotly.express as px
-import pandas as pd
+
+from app.core.cube import ScheduleCube
+from app.core.schedule_matrix import as_matrix
 
 def render_visualization_tab(config):
     st.subheader("📊 Visualisasi")
@@ -10,41 +12,63 @@ def render_visualization_tab(config):
         st.info("Belum ada data hasil proses. Jalankan proses di tab Upload & Proses.")
         return
 
-    df = st.session_state['processed_data']
-    time_slots = [c for c in df.columns if ':' in c]
-    if df.empty or not time_slots:
+    mat = as_matrix(st.session_state['processed_data'], st.session_state.get('time_slots'))
+    time_slots = mat.slot_str
+    if mat.empty or not time_slots:
         st.warning("Data tidak lengkap untuk divisualisasikan.")
         return
 
-    viz = st.selectbox("Pilih visualisasi", ["Heatmap", "Tabel", "Statistik"])
+    cube = _cube(mat, config)
+    max_poleks = config.max_poleks_per_slot
+
+    viz = st.selectbox("Pilih visualisasi", ["Heatmap", "Tabel", "Statistik",
+                                             "Utilisasi Poli", "Beban Dokter", "Overflow Poleks"])
 
     if viz == "Heatmap":
-        # Pivot ke bentuk hari x waktu -> max value (0 kosong, 1 R, 2 E)
-        records = []
-        for _, r in df.iterrows():
-            for ts in time_slots:
-                val = 0
-                if r[ts] == 'R':
-                    val = 1
-                elif r[ts] == 'E':
-                    val = 2
-                records.append({'Hari': r['HARI'], 'Waktu': ts, 'Val': val})
-
-        pivot = pd.DataFrame(records).pivot_table(index='Hari', columns='Waktu', values='Val', aggfunc='max', fill_value=0)
-        # urutkan hari menurut config
-        pivot = pivot.reindex(config.hari_list)
+        # hari x waktu: 0 kosong, 1 R, 2 E, 3 Poleks lewat batas — irisan kubus
+        poli = st.selectbox("Poli", ["(Semua)"] + cube.poli)
+        pivot = cube.heatmap(max_poleks, None if poli == "(Semua)" else poli)
         fig = px.imshow(pivot, labels=dict(x="Waktu", y="Hari", color="Status"), aspect="auto",
-                        color_continuous_scale=['white','lightgreen','lightblue','red'])
+                        color_continuous_scale=['white','lightgreen','lightblue','red'],
+                        zmin=0, zmax=3)
         fig.update_layout(height=450, title="Heatmap Jadwal")
         st.plotly_chart(fig, use_container_width=True)
 
     elif viz == "Tabel":
-        st.dataframe(df, use_container_width=True)
+        st.dataframe(mat.to_frame(), use_container_width=True)
 
     elif viz == "Statistik":
-        total_slots = len(df) * len(time_slots)
-        total_r = (df[time_slots] == 'R').sum().sum()
-        total_e = (df[time_slots] == 'E').sum().sum()
+        total_slots, total_r, total_e = cube.totals()
         st.metric("Total Slot", total_slots)
         st.metric("Total Reguler", f"{total_r} ({(total_r/total_slots*100) if total_slots else 0:.1f}%)")
         st.metric("Total Poleks", f"{total_e} ({(total_e/total_slots*100) if total_slots else 0:.1f}%)")
+
+    elif viz == "Utilisasi Poli":
+        util = cube.poli_utilization()
+        st.bar_chart(util.set_index("POLI")[["JAM REG", "JAM POLEKS"]])
+        st.dataframe(util, use_container_width=True)
+
+    elif viz == "Beban Dokter":
+        load = cube.doctor_load()
+        top = st.slider("Tampilkan N dokter teratas", 5, max(5, len(load)), min(20, max(5, len(load))))
+        st.bar_chart(load.head(top).set_index("DOKTER")[["JAM REG", "JAM POLEKS"]])
+        st.dataframe(load, use_container_width=True)
+
+    elif viz == "Overflow Poleks":
+        over = cube.overflow(max_poleks)
+        if over.empty:
+            st.success(f"Tidak ada slot dengan Poleks > {max_poleks}.")
+        else:
+            st.warning(f"{len(over)} slot melebihi batas {max_poleks} Poleks per slot.")
+            st.dataframe(over, use_container_width=True)
+
+
+def _cube(mat, config):
+    """Kubus agregat dibangun sekali per jadwal hasil proses (disimpan di session)."""
+    cube = st.session_state.get("schedule_cube")
+    # interval ikut grid matriks (bukan sidebar): jam tetap benar sebelum proses ulang
+    if (cube is None or cube.source is not mat
+            or cube.hari[:len(config.hari_list)] != list(config.hari_list)):
+        cube = ScheduleCube.build(mat, config.hari_list)
+        st.session_state["schedule_cube"] = cube
+    return cube
@@ -0,0 +1,36 @@
+# app/utils/parallel.py
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def _call(task):
+    fn, args = task
+    return fn(*args)
+
+
+def run_calls(calls, workers=1):
+    """
+    [(fn, args), ...] -> [fn(*args), ...] dengan urutan hasil = urutan input,
+    sehingga penggabungan deterministik. workers > 1 -> process pool (fn &
+    args harus bisa di-pickle, mis. method objek biasa); selain itu serial.
+    """
+    calls = list(calls)
+    if not workers or workers <= 1 or len(calls) <= 1:
+        return [fn(*args) for fn, args in calls]
+    with ProcessPoolExecutor(max_workers=min(workers, len(calls))) as pool:
+        return list(pool.map(_call, calls))
+
+
+def split_codes(codes, n_parts):
+    """
+    Bagi baris menjadi <= n_parts partisi berdasarkan rentang kode grup
+    (kode terurut), sehingga satu grup tidak pernah terbelah dan urutan
+    grup antar partisi tetap. Kode < 0 ikut partisi pertama.
+    Hasil: list array posisi baris.
+    """
+    codes = np.asarray(codes)
+    n_groups = codes.max() + 1 if len(codes) else 0
+    n_parts = max(1, min(n_parts, n_groups))
+    part = np.maximum(codes, 0) * n_parts // max(n_groups, 1)
+    return [np.flatnonzero(part == p) for p in range(n_parts)]
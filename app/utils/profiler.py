@@ -0,0 +1,134 @@
+# app/utils/profiler.py
+"""
+Profiling per tahap pipeline. Tahap dicatat lewat context manager:
+
+    with profiler.stage("clean", rows=len(df)):
+        ...
+
+Saat nonaktif stage() mengembalikan context kosong yang sama (tanpa alokasi
+& tanpa timer), jadi instrumentasi boleh tetap terpasang di jalur utama.
+Record dikirim sebagai baris log JSON & disimpan untuk tab "Performa".
+
+Status (aktif, memori, record) milik satu Profiler per sesi; `profiler`
+modul hanya meneruskan ke Profiler yang di-bind untuk rerun saat ini
+(ContextVar), jadi sesi Streamlit paralel tidak saling menimpa. Tanpa
+bind (CLI, benchmark) semua stage no-op.
+"""
+import json
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from .logger import get_logger
+
+
+_NOOP = nullcontext()
+
+# tumpukan tahap aktif (per context / thread)
+_STACK = ContextVar("profiler_stack", default=())
+
+# Profiler sesi untuk rerun / context saat ini
+_ACTIVE = ContextVar("profiler_session", default=None)
+
+
+class Profiler:
+    """Status profiling satu sesi (simpan di st.session_state, bind tiap rerun)."""
+
+    # tracemalloc global per proses: jalan selama ada sesi yang minta memori
+    _memory_users = weakref.WeakSet()
+    _started_tracemalloc = False
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.records = []
+        self.run_label = None
+        self._logger = get_logger("jadwal.profiler")
+
+    def configure(self, enabled=False, memory=False):
+        self.enabled = bool(enabled)
+        self.memory = bool(enabled and memory)
+        users = Profiler._memory_users
+        if self.memory:
+            users.add(self)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                Profiler._started_tracemalloc = True
+        else:
+            users.discard(self)
+            if not users and Profiler._started_tracemalloc:
+                tracemalloc.stop()
+                Profiler._started_tracemalloc = False
+
+    def start_run(self, label):
+        """Mulai run baru; record run sebelumnya dibuang."""
+        self.run_label = label
+        self.records = []
+
+    def stage(self, name, **counts):
+        if not self.enabled:
+            return _NOOP
+        return self._stage(name, counts)
+
+    @contextmanager
+    def _stage(self, name, counts):
+        stack = _STACK.get()
+        frame = {"mem0": 0, "peak": 0}
+        if self.memory:
+            # reset_peak global: simpan dulu peak berjalan ke semua tahap induk
+            # (sesi lain yang mengukur memori bersamaan ikut memengaruhi peak)
+            cur, peak = tracemalloc.get_traced_memory()
+            for parent in stack:
+                parent["peak"] = max(parent["peak"], peak)
+            tracemalloc.reset_peak()
+            frame["mem0"] = frame["peak"] = cur
+
+        token = _STACK.set(stack + (frame,))
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - t0
+            _STACK.reset(token)
+            rec = {"run": self.run_label, "stage": name, "depth": len(stack),
+                   "wall_s": round(wall, 6), **counts}
+            if self.memory:
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                for parent in stack:
+                    parent["peak"] = max(parent["peak"], peak)
+                rec["peak_mb"] = round((peak - frame["mem0"]) / 2**20, 3)
+            self.records.append(rec)
+            self._logger.info(json.dumps(rec, default=str))
+
+    def snapshot(self):
+        """Salinan record run terakhir (urut waktu selesai)."""
+        return {"run": self.run_label, "records": list(self.records)}
+
+
+class _SessionProfiler:
+    """Penerus ke Profiler sesi yang di-bind; stage() tanpa sesi aktif = no-op."""
+
+    def bind(self, session):
+        """Pakai `session` untuk sisa rerun / context ini."""
+        _ACTIVE.set(session)
+
+    def stage(self, name, **counts):
+        session = _ACTIVE.get()
+        if session is None or not session.enabled:
+            return _NOOP
+        return session._stage(name, counts)
+
+    def start_run(self, label):
+        session = _ACTIVE.get()
+        if session is not None:
+            session.start_run(label)
+
+    def snapshot(self):
+        session = _ACTIVE.get()
+        return session.snapshot() if session is not None else {"run": None, "records": []}
+
+
+# dipakai modul core: `with profiler.stage(...)`; status per sesi lewat bind()
+profiler = _SessionProfiler()
@@ -0,0 +1,83 @@
+# benchmarks/generator.py
+"""
+Generator workbook jadwal sintetis (sheet "Reguler" & "Poleks") dalam layout
+input yang diproses Scheduler: Nama Dokter | Poli Asal | Jenis Poli | kolom hari.
+"""
+import io
+import random
+
+import pandas as pd
+
+
+DAYS = ["Senin", "Selasa", "Rabu", "Kamis", "Jum'at", "Sabtu"]
+
+# format rapi vs format "kotor" yang diperbaiki DataCleaner.fix_format
+CLEAN_FMT = "{a:02d}:{b:02d}-{c:02d}:{d:02d}"
+MESSY_FMTS = [
+    "{a:02d}.{b:02d}-{c:02d}.{d:02d}",
+    "{a}.{b:02d} - {c}.{d:02d}",
+    "jam {a}.{b:02d}-{c}.{d:02d} WIB",
+    "{a:02d}:{b:02d} -{c:02d}:{d:02d}",
+]
+INVALID = ["libur", "cuti", "-", "on call"]
+
+
+def _range(r, lo, hi, messy):
+    a = r.randint(lo, hi - 1)
+    c = r.randint(a + 1, hi)
+    fmt = r.choice(MESSY_FMTS) if r.random() < messy else CLEAN_FMT
+    return fmt.format(a=a, b=r.choice([0, 15, 30, 45]), c=c, d=r.choice([0, 30])), c
+
+
+def _cell(r, ranges, messy):
+    """Satu sel berisi 1..ranges range, tidak saling tumpang (pagi -> siang)."""
+    k = r.randint(1, ranges)
+    parts, lo = [], 7
+    for _ in range(k):
+        if lo >= 14:
+            break
+        text, lo = _range(r, lo, 14, messy)
+        parts.append(text)
+    return " / ".join(parts)
+
+
+def make_sheet(jenis, n_doctors=100, n_polis=10, days=5, messy=0.3,
+               ranges_per_cell=1, fill=0.7, invalid=0.03, seed=0):
+    """
+    Satu sheet jadwal. Tiap dokter punya 1-2 poli; tiap (dokter, poli) satu baris.
+    fill = peluang sel hari terisi, invalid = peluang sel berisi teks tak valid.
+    """
+    r = random.Random(f"{seed}-{jenis}")
+    hari = DAYS[:days]
+    polis = [f"Poli {i + 1:02d}" for i in range(n_polis)]
+
+    rows = []
+    for d in range(n_doctors):
+        for poli in r.sample(polis, min(len(polis), r.choice([1, 1, 2]))):
+            row = {"Nama Dokter": f"dr. Dokter {d + 1:04d}", "Poli Asal": poli,
+                   # sebagian kosong -> diisi cleaner dengan jenis sheet
+                   "Jenis Poli": jenis if r.random() < 0.8 else None}
+            for h in hari:
+                x = r.random()
+                if x < invalid:
+                    row[h] = r.choice(INVALID)
+                elif x < invalid + fill:
+                    row[h] = _cell(r, ranges_per_cell, messy)
+                else:
+                    row[h] = None
+            rows.append(row)
+    return pd.DataFrame(rows, columns=["Nama Dokter", "Poli Asal", "Jenis Poli"] + hari)
+
+
+def make_workbook(n_doctors=100, n_polis=10, days=5, messy=0.3, ranges_per_cell=1,
+                  poleks_ratio=0.5, seed=0, **kw):
+    """Bytes .xlsx dengan sheet Reguler & Poleks."""
+    reg = make_sheet("Reguler", n_doctors, n_polis, days, messy, ranges_per_cell, seed=seed, **kw)
+    pol = make_sheet("Poleks", max(1, int(n_doctors * poleks_ratio)), n_polis, days, messy,
+                     ranges_per_cell, seed=seed, **kw)
+
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as xw:
+        reg.to_excel(xw, sheet_name="Reguler", index=False)
+        pol.to_excel(xw, sheet_name="Poleks", index=False)
+    return buf.getvalue()
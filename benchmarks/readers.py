@@ -0,0 +1,95 @@
+# benchmarks/readers.py
+"""
+Throughput baca sheet Reguler & Poleks per backend pembaca (baris/detik).
+
+    python -m benchmarks.readers                       # semua backend yang tersedia
+    python -m benchmarks.readers --doctors 1000 10000 --backends openpyxl pandas
+
+Tiap backend membuka workbook dari bytes lalu membaca kedua sheet
+(median dari --repeat kali, buka + baca dihitung bersama).
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from app.core.readers import BACKENDS, available_backends
+from app.core.workbook import ParsedWorkbook
+from benchmarks.generator import make_workbook
+from benchmarks.run import environment
+
+
+SHEETS = ("Reguler", "Poleks")
+
+
+def read_all(data, backend):
+    parsed = ParsedWorkbook(data, reader=backend)
+    frames = [parsed.sheet(s) for s in SHEETS]
+    return parsed.source.name, frames
+
+
+def measure(data, backend, repeat=3):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        used, frames = read_all(data, backend)
+        times.append(time.perf_counter() - t0)
+    rows = sum(len(f) for f in frames)
+    t = statistics.median(times)
+    return {"backend": backend, "used": used, "rows": rows, "time_s": t,
+            "rows_per_s": rows / t if t else 0.0, "runs": times}
+
+
+def run(sizes, backends, repeat=3, seed=0, log=sys.stderr):
+    cases = []
+    for n in sizes:
+        data = make_workbook(n_doctors=n, n_polis=12, days=5, messy=0.3, seed=seed)
+        ref = None
+        for backend in backends:
+            res = measure(data, backend, repeat)
+            # semua backend harus menghasilkan frame yang sama
+            frames = read_all(data, backend)[1]
+            if ref is None:
+                ref = frames
+            res["same_as_first"] = all(a.equals(b) for a, b in zip(ref, frames))
+            res.update(n_doctors=n, input_bytes=len(data))
+            cases.append(res)
+            print(f"  d{n:<6} {backend:<9} {res['rows']:>7} baris  {res['time_s']:>7.3f}s  "
+                  f"{res['rows_per_s']:>10.0f} baris/s", file=log)
+    return {"env": environment(), "cases": cases}
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.readers")
+    ap.add_argument("--doctors", type=int, nargs="+", default=[500, 2000, 5000])
+    ap.add_argument("--backends", nargs="+", choices=BACKENDS[1:], default=None,
+                    help="default: semua yang terpasang")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="tulis hasil JSON ke file (default stdout)")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    backends = args.backends or available_backends()
+    result = run(args.doctors, backends, args.repeat, args.seed)
+
+    table = pd.DataFrame(result["cases"])[["n_doctors", "backend", "used", "rows", "time_s",
+                                           "rows_per_s", "same_as_first"]]
+    print(table.to_string(index=False), file=sys.stderr)
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+# benchmarks/run.py
+"""
+Benchmark pipeline per tahap dengan workbook sintetis.
+
+    python -m benchmarks.run                          # matriks default
+    python -m benchmarks.run --doctors 200 1000 --days 6 --out hasil.json
+    python -m benchmarks.run --compare baseline.json  # tandai regresi
+
+Tiap kasus: timing (median dari --repeat kali, tanpa tracemalloc) lalu satu
+pass terpisah dengan tracemalloc untuk peak memori per tahap.
+"""
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from app.config import APP_VERSION, Config
+from app.core.analyzer import ErrorAnalyzer
+from app.core.cleaner import DataCleaner
+from app.core.excel_writer import ExcelWriter
+from app.core.scheduler import Scheduler
+from app.core.validator import Validator
+from app.core.workbook import ParsedWorkbook
+from benchmarks.generator import make_workbook
+
+
+STAGES = ["validate", "validate_fast", "parse", "clean", "schedule", "write", "analyze"]
+
+
+def run_stages(data, config):
+    """Satu lintasan pipeline; yield (tahap, fungsi) berurutan, state dibagi antar tahap."""
+    state = {}
+    sheets = ("Reguler", "Poleks")
+
+    def validate():
+        return Validator.validate(ParsedWorkbook(data))
+
+    def validate_fast():
+        return Validator.validate_fast(data, config.max_upload_mb * 2**20, config.max_rows)
+
+    def parse():
+        parsed = state["parsed"] = ParsedWorkbook(data)
+        state["frames"] = {s: parsed.sheet_or_empty(s) for s in sheets}
+
+    def clean():
+        for s in sheets:
+            DataCleaner.clean_block(state["frames"][s], config.hari_list, s, config.auto_fix_errors)
+
+    def schedule():
+        sch = Scheduler(config)
+        state["slot_str"] = sch.slot_labels()
+        state["df"] = sch.process_sheets(*(state["frames"][s] for s in sheets))
+
+    def write():
+        ExcelWriter(config).write(state["parsed"], state["df"], state["slot_str"])
+
+    def analyze():
+        an = ErrorAnalyzer()
+        window = an.slot_window(config)
+        for s in sheets:
+            an.analyze_sheet(state["frames"][s], config.hari_list)
+            an.issues(state["frames"][s], config.hari_list, s, window)
+
+    yield from [("validate", validate), ("validate_fast", validate_fast), ("parse", parse),
+                ("clean", clean), ("schedule", schedule), ("write", write), ("analyze", analyze),
+                ("_rows", lambda: len(state["df"]))]
+
+
+def measure(data, config, repeat=3, memory=True):
+    times = {s: [] for s in STAGES}
+    rows = 0
+    for _ in range(repeat):
+        for name, fn in run_stages(data, config):
+            if name == "_rows":
+                rows = fn()
+                continue
+            t0 = time.perf_counter()
+            fn()
+            times[name].append(time.perf_counter() - t0)
+
+    peaks = {}
+    if memory:
+        tracemalloc.start()
+        try:
+            for name, fn in run_stages(data, config):
+                if name == "_rows":
+                    continue
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                fn()
+                peaks[name] = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+        finally:
+            tracemalloc.stop()
+
+    stages = {}
+    for name in STAGES:
+        stages[name] = {"time_s": statistics.median(times[name]),
+                        "min_s": min(times[name]),
+                        "runs": times[name]}
+        if name in peaks:
+            stages[name]["peak_mb"] = round(peaks[name], 3)
+    return rows, stages
+
+
+def case_name(p):
+    return (f"d{p['n_doctors']}_p{p['n_polis']}_h{p['days']}"
+            f"_m{p['messy']}_r{p['ranges_per_cell']}")
+
+
+def environment():
+    return {
+        "app_version": APP_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "openpyxl": openpyxl.__version__,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def run(matrix, repeat=3, memory=True, config_overrides=None, log=sys.stderr):
+    cases = []
+    for params in matrix:
+        data = make_workbook(**params)
+        # override dari --config menang atas default per kasus
+        config = Config(**{"enable_sabtu": params["days"] > 5, **(config_overrides or {})})
+        rows, stages = measure(data, config, repeat, memory)
+        cases.append({"name": case_name(params), "params": params,
+                      "input_bytes": len(data), "rows": rows, "stages": stages})
+        total = sum(s["time_s"] for s in stages.values())
+        print(f"  {cases[-1]['name']}: {rows} baris, {total:.2f}s", file=log)
+    return {"env": environment(), "cases": cases}
+
+
+def compare(current, baseline, threshold=0.25, min_delta=0.01):
+    """
+    Regresi = tahap lebih lambat > threshold (relatif) DAN > min_delta detik,
+    atau peak memori > threshold. Hanya kasus dengan nama sama yang dibandingkan.
+    """
+    base = {c["name"]: c for c in baseline["cases"]}
+    lines, regressions = [], []
+    for case in current["cases"]:
+        ref = base.get(case["name"])
+        if ref is None:
+            continue
+        for stage, cur in case["stages"].items():
+            old = ref["stages"].get(stage)
+            if not old:
+                continue
+            ratio = cur["time_s"] / old["time_s"] if old["time_s"] else float("inf")
+            slow = ratio > 1 + threshold and cur["time_s"] - old["time_s"] > min_delta
+            mem = ("peak_mb" in cur and "peak_mb" in old and old["peak_mb"] > 0
+                   and cur["peak_mb"] > old["peak_mb"] * (1 + threshold) + 1)
+            flag = "REGRESI" if slow or mem else ""
+            lines.append(f"{case['name']:<28} {stage:<14} {old['time_s']:>8.3f}s "
+                         f"{cur['time_s']:>8.3f}s {ratio:>6.2f}x "
+                         f"{old.get('peak_mb', 0):>8.1f} {cur.get('peak_mb', 0):>8.1f}MB {flag}")
+            if flag:
+                regressions.append((case["name"], stage))
+    return lines, regressions
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    ap.add_argument("--doctors", type=int, nargs="+", default=[100, 500, 2000])
+    ap.add_argument("--polis", type=int, nargs="+", default=[12])
+    ap.add_argument("--days", type=int, nargs="+", default=[5])
+    ap.add_argument("--messy", type=float, nargs="+", default=[0.3])
+    ap.add_argument("--ranges", type=int, nargs="+", default=[1])
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--no-memory", action="store_true", help="lewati pass tracemalloc")
+    ap.add_argument("--config", type=json.loads, default=None,
+                    help='override Config, mis. \'{"style_mode": "rules"}\'')
+    ap.add_argument("--out", help="tulis hasil JSON ke file (default stdout)")
+    ap.add_argument("--compare", help="file JSON baseline")
+    ap.add_argument("--threshold", type=float, default=0.25)
+    ap.add_argument("--min-delta", type=float, default=0.01,
+                    help="selisih detik minimum agar dianggap regresi (redam noise)")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    matrix = [
+        {"n_doctors": d, "n_polis": p, "days": h, "messy": m, "ranges_per_cell": r,
+         "seed": args.seed}
+        for d, p, h, m, r in itertools.product(args.doctors, args.polis, args.days,
+                                               args.messy, args.ranges)
+    ]
+    result = run(matrix, args.repeat, not args.no_memory, args.config)
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(result, baseline, args.threshold, args.min_delta)
+        print(f"{'KASUS':<28} {'TAHAP':<14} {'BASE':>9} {'SEKARANG':>9} {'RASIO':>7} "
+              f"{'PEAK BASE':>8} {'PEAK':>8}")
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} regresi di atas ambang {args.threshold:.0%}")
+            return 1
+        print("\nTidak ada regresi.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
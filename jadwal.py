@@ -9,8 +9,12 @@ from app.core.analyzer import ErrorAnalyzer
 from app.ui.sidebar import render_sidebar
 from app.ui.tab_upload import render_upload_tab
 from app.ui.tab_analyzer import render_analyzer_tab
+from app.ui.tab_editor import render_editor_tab
+from app.ui.tab_calendar import render_calendar_tab
 from app.ui.tab_visualization import render_visualization_tab
 from app.ui.tab_settings import render_settings_tab
+from app.ui.tab_performance import render_performance_tab
+from app.utils.profiler import Profiler, profiler
 
 
 def main():
@@ -29,6 +33,11 @@ def main():
 
     # Sidebar
     render_sidebar(config)
+    # profiler per sesi: sesi lain tidak ikut menyalakan / menghapus record
+    if "profiler" not in st.session_state:
+        st.session_state.profiler = Profiler()
+    st.session_state.profiler.configure(config.profiling, config.profiling_memory)
+    profiler.bind(st.session_state.profiler)
 
     # Instantiate core modules
     scheduler = Scheduler(config)
@@ -36,18 +45,27 @@ def main():
     analyzer = ErrorAnalyzer()
 
     # Tabs
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab_edit, tab_cal, tab2, tab3, tab4, tab5 = st.tabs([
         "📤 Upload & Proses",
+        "✏️ Edit Jadwal",
+        "📅 Kalender",
         "🔍 Error Analyzer",
         "📊 Visualisasi",
-        "⚙️ Pengaturan"
+        "⚙️ Pengaturan",
+        "⏱️ Performa"
     ])
 
     with tab1:
         render_upload_tab(scheduler, writer, analyzer, config)
 
+    with tab_edit:
+        render_editor_tab(writer, config)
+
+    with tab_cal:
+        render_calendar_tab(writer, config)
+
     with tab2:
-        render_analyzer_tab(analyzer, config)
+        render_analyzer_tab(analyzer, writer, config)
 
     with tab3:
         render_visualization_tab(config)
@@ -55,6 +73,9 @@ def main():
     with tab4:
         render_settings_tab(config)
 
+    with tab5:
+        render_performance_tab(config)
+
 
 if __name__ == "__main__":
     main()
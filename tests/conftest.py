@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modul app/ diimpor dari root repo (tanpa paket terpasang)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
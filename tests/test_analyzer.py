@@ -0,0 +1,45 @@
+import io
+
+from openpyxl import Workbook
+
+from app.config import Config
+from app.core.analyzer import ErrorAnalyzer
+from app.core.readers import OpenpyxlSource, PandasSource, TableSource
+
+
+CSV = (b"Nama Dokter,Poli Asal,Jenis Poli,Senin\n"   # baris 1
+       b"dr. A,Poli 1,Reguler,08.00-10.00\n"         # 2
+       b"\n"                                          # 3
+       b"dr. B,Poli 2,Poleks,salah\n"                 # 4
+       b"dr. C,Poli 3,Reguler,10.00-09.00\n"          # 5
+       b"dr. D,Poli 4,Poleks,25.00-26.00\n"           # 6
+       b"\n")
+
+
+def bad_rows(source, sheet):
+    config = Config()
+    issues = ErrorAnalyzer().issues(source.read(sheet), config.hari_list, sheet)
+    return issues["BARIS"].tolist()
+
+
+def test_issue_rows_are_csv_line_numbers():
+    source = TableSource.open(io.BytesIO(CSV), "csv")
+
+    assert bad_rows(source, "Reguler") == [5]
+    assert bad_rows(source, "Poleks") == [4, 6]
+
+
+def test_issue_rows_are_excel_row_numbers():
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Reguler"
+    ws.append(["Nama Dokter", "Poli Asal", "Jenis Poli", "Senin"])
+    ws.append(["dr. A", "Poli 1", "Reguler", "08.00-10.00"])
+    ws.append([])
+    ws.append(["dr. C", "Poli 3", "Reguler", "10.00-09.00"])
+    buf = io.BytesIO()
+    wb.save(buf)
+
+    for source in (OpenpyxlSource(io.BytesIO(buf.getvalue())),
+                   PandasSource(io.BytesIO(buf.getvalue()))):
+        assert bad_rows(source, "Reguler") == [4]
@@ -0,0 +1,36 @@
+import numpy as np
+
+from app.config import Config
+from app.core.excel_writer import ExcelWriter
+from app.core.scheduler import Scheduler
+from app.core.workbook import ParsedWorkbook
+from app.utils.parallel import split_codes
+from benchmarks.generator import make_workbook
+
+
+def test_split_codes_keeps_groups_whole_and_ordered():
+    codes = np.array([0, 0, 1, 2, 2, 2, 3, -1, 4])
+    parts = split_codes(codes, 3)
+    assert sorted(np.concatenate(parts).tolist()) == list(range(len(codes)))
+    groups = [set(np.maximum(codes[p], 0)) for p in parts]
+    assert all(not (a & b) for i, a in enumerate(groups) for b in groups[i + 1:])
+    assert [max(g) for g in groups] == sorted(max(g) for g in groups)
+
+
+def test_process_pool_matches_serial_output():
+    data = make_workbook(n_doctors=120, n_polis=6, days=5, messy=0.3, seed=11)
+    parsed = ParsedWorkbook(data)
+    reg, pol = parsed.sheet("Reguler"), parsed.sheet("Poleks")
+
+    out = []
+    for workers in (1, 3):
+        config = Config(result_cache=False, workers=workers)
+        scheduler = Scheduler(config)
+        mat = scheduler.process_sheets(reg, pol)
+        writer = ExcelWriter(config)
+        agg = writer.aggregator.build(mat, scheduler.slot_labels())
+        out.append((mat.to_frame(), writer._recap_tables(agg)))
+
+    (serial, serial_tables), (pooled, pooled_tables) = out
+    assert serial.equals(pooled)
+    assert serial_tables == pooled_tables
@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app.config import Config
+from app.core.result_cache import ResultCache
+from app.core.scheduler import Scheduler
+
+
+@pytest.fixture
+def cached(tmp_path):
+    config = Config(result_cache=False)
+    df = pd.DataFrame([["dr. A", "Poli 1", "Reguler", "08.00-10.00"]],
+                      columns=["Nama Dokter", "Poli Asal", "Jenis Poli", "Senin"])
+    for h in config.hari_list[1:]:
+        df[h] = None
+    mat = Scheduler(config).process_sheets(df, df.iloc[:0])
+    cache = ResultCache(str(tmp_path))
+    key = cache.schedule_key(cache.digest(b"input"), config)
+    cache.put_schedule(key, mat, {"Reguler": 0})
+    return cache, key, mat
+
+
+def test_schedule_round_trip(cached):
+    cache, key, mat = cached
+    got, fix_report = cache.get_schedule(key)
+
+    assert got.to_frame().equals(mat.to_frame())
+    assert fix_report == {"Reguler": 0}
+
+
+@pytest.mark.parametrize("damage", [lambda b: b[:len(b) // 2],        # tulisan terpotong
+                                    lambda b: b"not a zip file",
+                                    lambda b: b[:40] + bytes(len(b) - 40)])
+def test_corrupted_schedule_is_a_miss_and_removed(cached, damage):
+    cache, key, mat = cached
+    path = cache._path(key, ".npz")
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(damage(data))
+
+    assert cache.get_schedule(key) is None
+    assert not os.path.exists(path)
+
+    cache.put_schedule(key, mat)
+    assert cache.get_schedule(key) is not None
@@ -0,0 +1,63 @@
+import pandas as pd
+
+from app.config import Config
+from app.core.scheduler import Scheduler
+
+
+def sheet(rows, hari_list):
+    df = pd.DataFrame(rows, columns=["Nama Dokter", "Poli Asal", "Jenis Poli", "Senin"])
+    for h in hari_list[1:]:
+        df[h] = None
+    return df
+
+
+def test_blank_row_in_middle_of_sheet_is_skipped():
+    config = Config(result_cache=False)
+    df = sheet([["dr. A", "Poli 1", "Reguler", "08.00-10.00"],
+                [None, None, None, "09.00-10.00"],
+                ["dr. B", "Poli 2", "Reguler", "08.00-09.00"],
+                ["dr. C", None, "Reguler", "10.00-11.00"]], config.hari_list)
+
+    scheduler = Scheduler(config)
+    mat = scheduler.process_sheets(df, df.iloc[:0])
+    out = mat.to_frame()
+
+    assert out["DOKTER"].tolist() == ["dr. A", "dr. B"]
+    assert (out["08:00"] == "R").all()
+    assert out.loc[0, "09:30"] == "R" and out.loc[1, "09:30"] == ""
+
+
+def test_blank_row_does_not_change_other_rows():
+    config = Config(result_cache=False)
+    rows = [["dr. A", "Poli 1", "Reguler", "08.00-10.00"],
+            ["dr. B", "Poli 2", "Reguler", "08.00-09.00"]]
+    clean = Scheduler(config).process_sheets(sheet(rows, config.hari_list), pd.DataFrame())
+    blank = Scheduler(config).process_sheets(
+        sheet(rows[:1] + [[None, None, None, "09.00-10.00"]] + rows[1:], config.hari_list),
+        pd.DataFrame())
+
+    assert clean.to_frame().equals(blank.to_frame())
+
+
+def test_blank_row_in_uploaded_workbook():
+    import io
+    from openpyxl import Workbook
+    from app.core.workbook import ParsedWorkbook
+
+    config = Config(result_cache=False)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Reguler"
+    ws.append(["Nama Dokter", "Poli Asal", "Jenis Poli"] + config.hari_list)
+    ws.append(["dr. A", "Poli 1", "Reguler", "08.00-10.00"])
+    ws.append([])
+    ws.append(["dr. B", "Poli 2", "Reguler", "08.00-09.00"])
+    wb.create_sheet("Poleks").append(["Nama Dokter", "Poli Asal", "Jenis Poli"] + config.hari_list)
+    buf = io.BytesIO()
+    wb.save(buf)
+
+    for reader in ("openpyxl", "pandas"):
+        parsed = ParsedWorkbook(buf.getvalue(), "jadwal.xlsx", reader=reader)
+        mat = Scheduler(config).process_sheets(parsed.sheet_or_empty("Reguler"),
+                                               parsed.sheet_or_empty("Poleks"))
+        assert mat.to_frame()["DOKTER"].tolist() == ["dr. A", "dr. B"]
@@ -0,0 +1,20 @@
+from app.config import Config
+from app.core.excel_writer import ExcelWriter
+from app.core.scheduler import Scheduler
+from app.core.validator import Validator
+from app.core.workbook import ParsedWorkbook
+
+
+def test_generated_template_passes_validate_fast():
+    for config in (Config(result_cache=False), Config(result_cache=False, enable_sabtu=True)):
+        buf = ExcelWriter(config).generate_template()
+        assert Validator.validate_fast(buf.getvalue()) == (True, None)
+
+
+def test_generated_template_is_schedulable():
+    config = Config(result_cache=False)
+    parsed = ParsedWorkbook(ExcelWriter(config).generate_template().getvalue())
+    mat = Scheduler(config).process_sheets(parsed.sheet("Reguler"), parsed.sheet("Poleks"))
+    out = mat.to_frame()
+    assert out["DOKTER"].tolist() == ["dr. Contoh", "dr. Contoh"]
+    assert out["JENIS POLI"].tolist() == ["Reguler", "Poleks"]